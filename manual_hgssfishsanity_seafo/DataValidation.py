@@ -1,8 +1,10 @@
 import logging
+import os
 import re
 import json
 from worlds.AutoWorld import World
 from BaseClasses import MultiWorld, ItemClassification
+from collections import Counter
 
 
 class ValidationError(Exception):
@@ -13,6 +15,33 @@ class DataValidation():
     item_table = []
     location_table = []
     region_table = {}
+    item_category_to_item_names = {}
+    # built by buildLookups before the checks run
+    item_names = set()
+    item_categories = set()
+    requires_tokens = {}
+
+    @staticmethod
+    def buildLookups():
+        DataValidation.item_names = {item["name"] for item in DataValidation.item_table}
+        DataValidation.item_categories = {category for item in DataValidation.item_table for category in item.get("category", [])}
+        DataValidation.requires_tokens = {}
+
+    @staticmethod
+    def _getRequiresTokens(requires: str) -> list[str]:
+        """The |item| and |@category| tokens of a requires string, parsed only once for all the checks"""
+        tokens = DataValidation.requires_tokens.get(requires)
+        if tokens is None:
+            tokens = DataValidation.requires_tokens[requires] = re.findall(r'\|[^|]+\|', requires)
+        return tokens
+
+    @staticmethod
+    def _getRequiresJsonTokens(requires) -> list[str]:
+        """The |item| tokens as they are in the json of a requires"""
+        if isinstance(requires, str):
+            # json escapes characters one by one, so these are the string's tokens escaped the same way
+            return [json.dumps(token)[1:-1] for token in DataValidation._getRequiresTokens(requires)]
+        return re.findall(r'\|[^|]+\|', json.dumps(requires))
 
 
     @staticmethod
@@ -23,7 +52,7 @@ class DataValidation():
 
             if isinstance(location["requires"], str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
+                for item in DataValidation._getRequiresTokens(location["requires"]):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
@@ -37,7 +66,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in DataValidation.item_category_to_item_names
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -52,7 +81,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -73,7 +102,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+                            item_exists = or_item_name in DataValidation.item_names
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
@@ -84,7 +113,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -99,7 +128,7 @@ class DataValidation():
 
             if isinstance(region["requires"], str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
+                for item in DataValidation._getRequiresTokens(region["requires"]):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
@@ -113,7 +142,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in DataValidation.item_category_to_item_names
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -128,7 +157,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -149,7 +178,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == or_item_name]) > 0
+                            item_exists = or_item_name in DataValidation.item_names
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
@@ -160,7 +189,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item["name"] for item in DataValidation.item_table if item["name"] == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -171,13 +200,26 @@ class DataValidation():
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
+            region_exists = location["region"] in DataValidation.region_table
 
             if not region_exists:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
 
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        # the first location and region whose requires use each |item| token, the requires are compared as json so we don't have to guess the data type
+        locations_requiring: dict[str, str] = {}
+        for location in DataValidation.location_table:
+            if "requires" in location:
+                for token in DataValidation._getRequiresJsonTokens(location["requires"]):
+                    locations_requiring.setdefault(token, location.get("name"))
+
+        regions_requiring: dict[str, str] = {}
+        for region_name, region in DataValidation.region_table.items():
+            if "requires" in region:
+                for token in DataValidation._getRequiresJsonTokens(region["requires"]):
+                    regions_requiring.setdefault(token, region_name)
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if "progression" in item and item["progression"]:
@@ -188,38 +230,12 @@ class DataValidation():
                 continue
 
             # check location requires for the presence of item name
-            for location in DataValidation.location_table:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
-
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item["name"]) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
-                else:
-                    if item["name"] in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], location["name"]))
+            if '|{}|'.format(item["name"]) in locations_requiring:
+                raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item["name"], locations_requiring['|{}|'.format(item["name"])]))
 
             # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
-
-                if "requires" not in region:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item["name"]) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
-                else:
-                    if item["name"] in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], region_name))
+            if '|{}|'.format(item["name"]) in regions_requiring:
+                raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item["name"], regions_requiring['|{}|'.format(item["name"])]))
 
     @staticmethod
     def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
@@ -297,34 +313,31 @@ class DataValidation():
                 continue
 
             for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
+                region_exists = connecting_region in DataValidation.region_table
 
                 if not region_exists:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
 
     @staticmethod
     def checkForDuplicateItemNames():
+        name_counts = Counter(i["name"] for i in DataValidation.item_table)
         for item in DataValidation.item_table:
-            name_count = len([i for i in DataValidation.item_table if i["name"] == item["name"]])
-
-            if name_count > 1:
+            if name_counts[item["name"]] > 1:
                 raise ValidationError("Item %s is defined more than once." % (item["name"]))
 
     @staticmethod
     def checkForDuplicateLocationNames():
+        name_counts = Counter(l["name"] for l in DataValidation.location_table)
         for location in DataValidation.location_table:
-            name_count = len([l for l in DataValidation.location_table if l["name"] == location["name"]])
-
-            if name_count > 1:
+            if name_counts[location["name"]] > 1:
                 raise ValidationError("Location %s is defined more than once." % (location["name"]))
 
     @staticmethod
     def checkForDuplicateRegionNames():
         # this currently does nothing because the region name is a dict key, which will never be non-unique / limited to 1
+        name_counts = Counter(DataValidation.region_table.keys())
         for region_name in DataValidation.region_table:
-            name_count = len([r for r in DataValidation.region_table if r == region_name])
-
-            if name_count > 1:
+            if name_counts[region_name] > 1:
                 raise ValidationError("Region %s is defined more than once." % (region_name))
 
     @staticmethod
@@ -340,12 +353,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item["name"] for item in DataValidation.item_table]:
+                    if not item_name in DataValidation.item_names:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if category_name not in DataValidation.item_categories:
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -389,7 +402,7 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item["name"] for item in DataValidation.item_table]:
+                if not item_name in DataValidation.item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
@@ -403,7 +416,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if category_name not in DataValidation.item_categories:
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -429,11 +442,10 @@ class DataValidation():
             return
 
         nonstarting_regions = [region for region in DataValidation.region_table if not DataValidation.region_table[region].get("starting")]
+        connected_regions = {connecting_region for region in DataValidation.region_table.values() for connecting_region in region.get("connects_to") or []}
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in connected_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -450,9 +462,22 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
         raise Exception(f"\n\n{heading} \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
 
 # Called during stage_assert_generate
-def runGenerationDataValidation(cls) -> None:
+def runGenerationDataValidation(cls, force: bool = False) -> None:
+    """Run every generation check on the data, unless they already passed for the same data and code\n
+    The data files and every python file of the apworld are hashed, so any change to them runs the checks again\n
+    Setting the MANUAL_FORCE_DATA_VALIDATION environment variable, or force, always runs them"""
+    from .Helpers import get_package_hash, load_data_cache, save_data_cache
+
+    validation_hash = get_package_hash()
+    if not force and not os.environ.get("MANUAL_FORCE_DATA_VALIDATION") and load_data_cache("validation", validation_hash):
+        return
+
     validation_errors = []
 
+    # the category index is built with the item lookups, after the tables above were seeded
+    DataValidation.item_category_to_item_names = cls.item_category_to_item_names
+    DataValidation.buildLookups()
+
     # check that requires have correct item names in locations and regions
     try: DataValidation.checkItemNamesInLocationRequires()
     except ValidationError as e: validation_errors.append(e)
@@ -509,3 +534,5 @@ def runGenerationDataValidation(cls) -> None:
         heading = f"ValidationError(s) in {cls.game}:";
 
         raise Exception("\n\n%s \n\n%s\n\n" % (heading, "\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+
+    save_data_cache("validation", validation_hash, True)
@@ -1,6 +1,7 @@
 from BaseClasses import Location
 from .Data import location_table
 from .Game import starting_index
+from .Items import item_name_to_item, item_category_to_real_item_names
 
 
 ######################
@@ -46,10 +47,12 @@ if not victory_names:
 location_id_to_name: dict[int, str] = {}
 location_name_to_location: dict[str, dict] = {}
 location_name_groups: dict[str, list[str]] = {}
+region_name_to_locations: dict[str, list[dict]] = {}
 
 for item in location_table:
     location_id_to_name[item["id"]] = item["name"]
     location_name_to_location[item["name"]] = item
+    region_name_to_locations.setdefault(item["region"], []).append(item)
 
     for c in item.get("category", []):
         if c not in location_name_groups:
@@ -60,6 +63,28 @@ for item in location_table:
 # location_id_to_name[None] = "__Manual Game Complete__"
 location_name_to_id = {name: id for id, name in location_id_to_name.items()}
 
+# the item names each location forbids or can be given by place_item(_category), resolved once here instead of for every player
+location_name_to_forbidden_item_names: dict[str, frozenset[str]] = {}
+location_name_to_eligible_item_names: dict[str, frozenset[str]] = {}
+for location_name, location in location_name_to_location.items():
+    forbidden_item_names = set()
+    if location.get("dont_place_item"):
+        forbidden_item_names.update(name for name in location["dont_place_item"] if name in item_name_to_item)
+
+    if location.get("dont_place_item_category"):
+        for c in location["dont_place_item_category"]:
+            forbidden_item_names.update(item_category_to_real_item_names.get(c, ()))
+
+    if forbidden_item_names:
+        location_name_to_forbidden_item_names[location_name] = frozenset(forbidden_item_names)
+
+    if "place_item" in location or "place_item_category" in location:
+        eligible_item_names = set(location.get("place_item") or [])
+        for c in location.get("place_item_category") or []:
+            eligible_item_names.update(item_category_to_real_item_names.get(c, ()))
+
+        location_name_to_eligible_item_names[location_name] = frozenset(eligible_item_names - forbidden_item_names)
+
 ######################
 # Location classes
 ######################
@@ -1,11 +1,11 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Any
 from enum import IntEnum
 from operator import eq, ge, le
 
 from .Regions import regionMap
 from .hooks import Rules
 from .Helpers import clamp, is_item_enabled, is_option_enabled, get_option_value, convert_string_to_type,\
-    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat
+    format_to_valid_identifier, format_state_prog_items_key, ProgItemsCat, option_only_requirement, cached_requirement
 
 from BaseClasses import MultiWorld, CollectionState
 from worlds.AutoWorld import World
@@ -16,6 +16,7 @@ import re
 import math
 import inspect
 import logging
+from weakref import WeakKeyDictionary
 
 if TYPE_CHECKING:
     from . import ManualWorld
@@ -101,263 +102,682 @@ def evaluate_postfix(expr: str, location: str) -> bool:
 
     return stack.pop()
 
-def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
-    # this is only called when the area (think, location or region) has a "requires" field that is a string
-    def checkRequireStringForArea(state: CollectionState, area: dict):
-        requires_list = area["requires"]
+def _is_relative_count(item_count: str) -> bool:
+    """Is this count one of the 'all', 'half' or 'N%' counts that depends on the real item counts?"""
+    return item_count.lower() in ('all', 'half') or (item_count.endswith('%') and len(item_count) > 1)
 
-        # Get the "real" item counts of item in the pool/placed/starting_items
-        items_counts = world.get_item_counts(player, only_progression=True)
+def _resolve_relative_count(item_count: str, total: int) -> int:
+    """Turn an 'all', 'half' or 'N%' count into the required amount out of total."""
+    if item_count.lower() == 'all':
+        return total
+    elif item_count.lower() == 'half':
+        return int(total / 2)
+    else:
+        percent = clamp(float(item_count[:-1]) / 100, 0, 1)
+        return math.ceil(total * percent)
 
-        # Preparing some variables for exception messages
-        area_type = "region" if area.get("is_region",False) else "location"
-        area_name = area.get("name", f"unknown with these parameters: {area}")
+def _describe_area(area: dict) -> tuple[str, str]:
+    """Preparing some variables for exception messages"""
+    area_type = "region" if area.get("is_region", False) else "location"
+    area_name = area["name"] if "name" in area else f"unknown with these parameters: {area}"
+    return area_type, area_name
 
-        if requires_list == "":
-            return True
+class RequireNode:
+    """A compiled piece of a "requires". Calling it with a CollectionState evaluates it."""
+    __slots__ = ()
 
-        def findAndRecursivelyExecuteFunctions(requires_list: str, recursionDepth: int = 0) -> str:
-            found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires_list)
-            if found_functions:
-                if recursionDepth > world.rules_functions_maximum_recursion:
-                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {world.rules_functions_maximum_recursion}) \
-                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
-                                         \n    And the currently processed requires look like this: "{requires_list}"')
-                else:
-                    for item in found_functions:
-                        func_name = item[0]
-                        func_args = item[1].split(",")
-                        if func_args == ['']:
-                            func_args.pop()
-
-                        func = globals().get(func_name)
-
-                        if func is None:
-                            func = getattr(Rules, func_name, None)
-
-                        if not callable(func):
-                            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
-
-                        convert_req_function_args(state, func, func_args, area_name)
-                        try:
-                            result = func(*func_args)
-                        except Exception as ex:
-                            raise RuntimeError(f'A call to the function "{func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
-                                                \nUnless it was called by another function, it should look something like "{{{func_name}({item[1]})}}" in {area_type}s.json. \
-                                                \nFull error message: \
-                                                \n\n{type(ex).__name__}: {ex}')
-                        if isinstance(result, bool):
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", "1" if result else "0")
-                        else:
-                            requires_list = requires_list.replace("{" + func_name + "(" + item[1] + ")}", str(result))
-
-                requires_list = findAndRecursivelyExecuteFunctions(requires_list, recursionDepth + 1)
-            return requires_list
-
-        requires_list = findAndRecursivelyExecuteFunctions(requires_list)
-
-        # parse user written statement into list of each item
-        for item in re.findall(r'\|[^|]+\|', requires_list):
-            require_type = 'item'
-
-            if '|@' in item:
-                require_type = 'category'
-
-            item_base = item
-            item = item.lstrip('|@$').rstrip('|')
-
-            item_parts = item.split(":")  # type: list[str]
-            item_name = item
-            item_count = "1"
-
-
-            if len(item_parts) > 1:
-                item_name = item_parts[0].strip()
-                item_count = item_parts[1].strip()
-
-            total = 0
-
-            if require_type == 'category':
-                category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-                category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
-                if item_count.lower() == 'all':
-                    item_count = category_items_counts
-                elif item_count.lower() == 'half':
-                    item_count = int(category_items_counts / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(category_items_counts * percent)
-                else:
-                    try:
-                        item_count = int(item_count)
-                    except ValueError as e:
-                        raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
-
-                for category_item in category_items:
-                    total += state.count(category_item["name"], player)
-
-                    if total >= item_count:
-                        requires_list = requires_list.replace(item_base, "1")
-            elif require_type == 'item':
-                item_current_count = items_counts.get(item_name, 0)
-                if item_count.lower() == 'all':
-                    item_count = item_current_count
-                elif item_count.lower() == 'half':
-                    item_count = int(item_current_count / 2)
-                elif item_count.endswith('%') and len(item_count) > 1:
-                    percent = clamp(float(item_count[:-1]) / 100, 0, 1)
-                    item_count = math.ceil(item_current_count * percent)
-                else:
-                    item_count = int(item_count)
+    def __call__(self, state: CollectionState) -> bool:
+        raise NotImplementedError
 
-                total = state.count(item_name, player)
+    def cost(self) -> int:
+        """Rough cost of evaluating this node, used to check the cheapest operands of an AND/OR first."""
+        return 1
 
-                if total >= item_count:
-                    requires_list = requires_list.replace(item_base, "1")
+class RequireConstant(RequireNode):
+    """A literal 1/0 or a requires that is always/never met."""
+    __slots__ = ("value",)
 
-            if total <= item_count:
-                requires_list = requires_list.replace(item_base, "0")
+    def __init__(self, value: bool):
+        self.value = value
 
-        requires_list = re.sub(r'\s?\bAND\b\s?', '&', requires_list, 0, re.IGNORECASE)
-        requires_list = re.sub(r'\s?\bOR\b\s?', '|', requires_list, 0, re.IGNORECASE)
+    def __call__(self, state: CollectionState) -> bool:
+        return self.value
 
-        requires_string = infix_to_postfix("".join(requires_list), area)
-        return (evaluate_postfix(requires_string, area))
+    def cost(self) -> int:
+        return 0
 
-    # this is only called when the area (think, location or region) has a "requires" field that is a dict
-    def checkRequireDictForArea(state: CollectionState, area: dict):
-        canAccess = True
+class RequireItem(RequireNode):
+    """|Item| or |Item:count|. An all, half or N% count is already resolved to a number when compiled."""
+    __slots__ = ("player", "item_name", "item_count")
 
-        for item in area["requires"]:
-            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
-            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
-                canAccessOr = True
-                or_items = item
+    def __init__(self, player: int, item_name: str, item_count: int):
+        self.player = player
+        self.item_name = item_name
+        self.item_count = item_count
 
-                if isinstance(item, dict):
-                    or_items = item["or"]
+    def __call__(self, state: CollectionState) -> bool:
+        return state.count(self.item_name, self.player) >= self.item_count
 
-                for or_item in or_items:
-                    or_item_parts = or_item.split(":")
-                    or_item_name = or_item
-                    or_item_count = 1
+class RequireCategory(RequireNode):
+    """|@Category:count|, met when the items of the category add up to count."""
+    __slots__ = ("player", "category_name", "category_items", "item_count")
 
-                    if len(or_item_parts) > 1:
-                        or_item_name = or_item_parts[0]
-                        or_item_count = int(or_item_parts[1])
+    def __init__(self, player: int, category_name: str, category_items: tuple[str, ...], item_count: int):
+        self.player = player
+        self.category_name = category_name
+        self.category_items = category_items
+        self.item_count = item_count
 
-                    if not state.has(or_item_name, player, or_item_count):
-                        canAccessOr = False
+    def __call__(self, state: CollectionState) -> bool:
+        item_count = self.item_count
+        total = 0
+        for item_name in self.category_items:
+            total += state.count(item_name, self.player)
 
-                if canAccessOr:
-                    canAccess = True
-                    break
-            else:
-                item_parts = item.split(":")
-                item_name = item
-                item_count = 1
+            if total >= item_count:
+                return True
+
+        # an empty category is never met, even with a count of 0
+        return False
+
+    def cost(self) -> int:
+        return 1 + len(self.category_items)
+
+class RequireAnyItem(RequireNode):
+    """Plain |Item| joined by OR, checked in one go."""
+    __slots__ = ("player", "item_names")
+
+    def __init__(self, player: int, item_names: list[str]):
+        self.player = player
+        self.item_names = item_names
+
+    def __call__(self, state: CollectionState) -> bool:
+        return state.has_any(self.item_names, self.player)
 
-                if len(item_parts) > 1:
-                    item_name = item_parts[0]
-                    item_count = int(item_parts[1])
+class RequireAllItems(RequireNode):
+    """Plain |Item| joined by AND, checked in one go."""
+    __slots__ = ("player", "item_names")
 
-                if not state.has(item_name, player, item_count):
-                    canAccess = False
+    def __init__(self, player: int, item_names: list[str]):
+        self.player = player
+        self.item_names = item_names
 
-        return canAccess
+    def __call__(self, state: CollectionState) -> bool:
+        return state.has_all(self.item_names, self.player)
+
+class RequireNot(RequireNode):
+    __slots__ = ("operand",)
+
+    def __init__(self, operand: RequireNode):
+        self.operand = operand
+
+    def __call__(self, state: CollectionState) -> bool:
+        return not self.operand(state)
+
+    def cost(self) -> int:
+        return self.operand.cost()
+
+class RequireAnd(RequireNode):
+    __slots__ = ("operands",)
+
+    def __init__(self, operands: list[RequireNode]):
+        self.operands = operands
+
+    def __call__(self, state: CollectionState) -> bool:
+        for operand in self.operands:
+            if not operand(state):
+                return False
+        return True
+
+    def cost(self) -> int:
+        return sum(operand.cost() for operand in self.operands)
+
+class RequireOr(RequireNode):
+    __slots__ = ("operands",)
+
+    def __init__(self, operands: list[RequireNode]):
+        self.operands = operands
+
+    def __call__(self, state: CollectionState) -> bool:
+        for operand in self.operands:
+            if operand(state):
+                return True
+        return False
+
+    def cost(self) -> int:
+        return sum(operand.cost() for operand in self.operands)
+
+class RequireFunction(RequireNode):
+    """{Function(args)} of a function annotated to return a bool, any other function is read through a RequireSplice.\n
+    The result is only cached per state for functions marked with cached_requirement."""
+    __slots__ = ("compiler", "area", "func", "func_name", "func_args", "depth", "cache_key", "args", "state_indexes")
+
+    def __init__(self, compiler: "RequiresCompiler", area: dict, func, func_name: str, func_args: str, depth: int):
+        self.compiler = compiler
+        self.area = area
+        self.func = func
+        self.func_name = func_name
+        self.func_args = func_args
+        self.depth = depth
+        self.cache_key = (func_name, func_args) if getattr(func, "cached_requirement", False) else None
+        # the arguments never change, only the state has to be placed in them for each call
+        self.args, self.state_indexes = compiler.bind_function_args(func, func_args, area)
+
+    def __call__(self, state: CollectionState) -> bool:
+        result = self.result(state)
+
+        if not isinstance(result, bool):
+            area_type, area_name = _describe_area(self.area)
+            raise TypeError(f'The function "{self.func_name}" in {area_type} "{area_name}"\'s requires is annotated to return a bool but returned "{result}" instead.')
+
+        return result
+
+    def result(self, state: CollectionState) -> bool|str:
+        """The bool or the requires string returned by the function for this state."""
+        if self.cache_key is None:
+            return self.evaluate(state)
+
+        cache = self.compiler.get_state_cache(state)
+        result = cache.get(self.cache_key)
+        if result is None:
+            result = cache[self.cache_key] = self.evaluate(state)
+
+        return result
+
+    def call(self, state: Optional[CollectionState]):
+        args = self.args
+        if self.state_indexes:
+            args = args.copy()
+            for index in self.state_indexes:
+                args[index] = state
+
+        try:
+            return self.func(*args)
+        except Exception as ex:
+            area_type, area_name = _describe_area(self.area)
+            raise RuntimeError(f'A call to the function "{self.func_name}" in {area_type} "{area_name}"\'s requires raised an Exception. \
+                                \nUnless it was called by another function, it should look something like "{{{self.func_name}({self.func_args})}}" in {area_type}s.json. \
+                                \nFull error message: \
+                                \n\n{type(ex).__name__}: {ex}')
+
+    def evaluate(self, state: Optional[CollectionState]) -> bool|str:
+        result = self.call(state)
+
+        if isinstance(result, bool):
+            return result
+
+        return str(result)
+
+    def cost(self) -> int:
+        return 100
+
+class RequireSplice(RequireNode):
+    """A requires with functions that can return a requires string.\n
+    Each returned string is read as part of the requires around it, as if it was written in place of the function,
+    so "|A| AND {F()}" with F returning "|B| OR |C|" reads as "|A| AND |B| OR |C|".
+    The requires read for each combination of results is kept for the next time it comes up."""
+    __slots__ = ("compiler", "area", "tokens", "functions", "compiled_results")
+
+    def __init__(self, compiler: "RequiresCompiler", area: dict, tokens: list[tuple[str, Any]]):
+        self.compiler = compiler
+        self.area = area
+        self.tokens = tokens
+        self.functions: list[RequireFunction] = [value for kind, value in tokens if kind == "splice"]
+        self.compiled_results: dict[tuple[bool|str, ...], RequireNode] = {}
+
+    def __call__(self, state: CollectionState) -> bool:
+        results = tuple(function.result(state) for function in self.functions)
+        compiled = self.compiled_results.get(results)
+        if compiled is None:
+            compiled = self.compiled_results[results] = self.compiler.splice_results(self.tokens, results, self.area)
+
+        return compiled(state)
+
+    def cost(self) -> int:
+        # the functions plus whatever they return, which can't be known ahead of time
+        return 100 * len(self.functions)
+
+class RequireRegion(RequireNode):
+    """The requires of a region, shared by its entrances and locations.\n
+    The result is cached per state like function results, so a region is only evaluated once for all of its locations.
+    Only used for requires that can be cached, see _is_cacheable."""
+    __slots__ = ("compiler", "region_name", "operand")
+
+    def __init__(self, compiler: "RequiresCompiler", region_name: str, operand: RequireNode):
+        self.compiler = compiler
+        self.region_name = region_name
+        self.operand = operand
+
+    def __call__(self, state: CollectionState) -> bool:
+        cache = self.compiler.get_state_cache(state)
+        result = cache.get(self)
+        if result is None:
+            result = cache[self] = self.operand(state)
+
+        return result
+
+    def cost(self) -> int:
+        return self.operand.cost()
+
+def _collect_read_items(node: RequireNode, item_names: set[str]) -> bool:
+    """Adds the items read by a compiled requires to item_names.
+    Returns True if it also calls requirement functions, which could read any item."""
+    if isinstance(node, RequireItem):
+        item_names.add(node.item_name)
+    elif isinstance(node, (RequireAnyItem, RequireAllItems)):
+        item_names.update(node.item_names)
+    elif isinstance(node, RequireCategory):
+        item_names.update(node.category_items)
+    elif isinstance(node, (RequireNot, RequireRegion)):
+        return _collect_read_items(node.operand, item_names)
+    elif isinstance(node, (RequireAnd, RequireOr)):
+        reads_functions = False
+        for operand in node.operands:
+            reads_functions = _collect_read_items(operand, item_names) or reads_functions
+        return reads_functions
+    elif isinstance(node, (RequireFunction, RequireSplice)):
+        return True
+    return False
 
-    # handle any type of checking needed, then ferry the check off to a dedicated method for that check
-    def fullLocationOrRegionCheck(state: CollectionState, area: dict):
+def _is_cacheable(node: RequireNode) -> bool:
+    """Does the result of a compiled requires only depend on the player's items, so it can be cached per state?"""
+    if isinstance(node, RequireFunction):
+        return node.cache_key is not None
+    elif isinstance(node, RequireSplice):
+        # the returned requires could call functions that aren't cached
+        return False
+    elif isinstance(node, (RequireNot, RequireRegion)):
+        return _is_cacheable(node.operand)
+    elif isinstance(node, (RequireAnd, RequireOr)):
+        return all(_is_cacheable(operand) for operand in node.operands)
+    return True
+
+_require_token_pattern = re.compile(r"""\s*(?:
+    (?P<function>\{(?P<func_name>\w+)\((?P<func_args>.*?)\)\})
+    |(?P<item>\|[^|]+\|)
+    |(?P<operator>\bAND\b|\bOR\b)
+    |(?P<not>!)
+    |(?P<open>\()
+    |(?P<close>\))
+    |(?P<constant>[01])
+)""", re.IGNORECASE | re.VERBOSE)
+
+class RequiresCompiler:
+    """Turns the "requires" of locations and regions into RequireNode trees for a single player.\n
+    The returned nodes can directly be used as access rules."""
+
+    def __init__(self, world: "ManualWorld", multiworld: MultiWorld, player: int):
+        self.world = world
+        self.multiworld = multiworld
+        self.player = player
+        self.state_caches: WeakKeyDictionary[CollectionState, dict[Any, bool|str]] = WeakKeyDictionary()
+        self.binding_plans: dict[Any, list[tuple[inspect.Parameter, Optional[str]]]] = {}
+        # which locations/entrances have a rule reading each item, see register_rule
+        self.spots_by_item_name: dict[str, set] = {}
+        self.spots_with_functions: set = set()
+        self.dirty_spots: WeakKeyDictionary[CollectionState, set] = WeakKeyDictionary()
+
+    def get_state_cache(self, state: CollectionState) -> dict[Any, bool|str]:
+        """The requirement function and region results already computed for this state."""
+        cache = self.state_caches.get(state)
+        if cache is None:
+            cache = self.state_caches[state] = {}
+        return cache
+
+    def clear_state_cache(self, state: CollectionState):
+        """Forget the requirement function and region results of this state, called whenever it collects or removes an item of the player."""
+        self.state_caches.pop(state, None)
+
+    def register_rule(self, spot, rule: RequireNode):
+        """Adds the location or entrance to the spots of every item its compiled rule reads."""
+        item_names: set[str] = set()
+        if _collect_read_items(rule, item_names):
+            self.spots_with_functions.add(spot)
+        for item_name in item_names:
+            self.spots_by_item_name.setdefault(item_name, set()).add(spot)
+
+    def get_spots_reading(self, item_name: str) -> set:
+        """The locations and entrances whose rule can change when the count of this item changes.\n
+        Rules calling requirement functions are always included since they could read any item."""
+        return self.spots_by_item_name.get(item_name, set()) | self.spots_with_functions
+
+    def track_dirty_spots(self, state: CollectionState):
+        """Start recording which locations and entrances need to be checked again after this state's items change."""
+        self.dirty_spots[state] = set()
+
+    def pop_dirty_spots(self, state: CollectionState) -> set:
+        """The locations and entrances whose rule read an item collected or removed by a tracked state since the last call."""
+        dirty = self.dirty_spots.get(state)
+        if dirty is None:
+            return set()
+        self.dirty_spots[state] = set()
+        return dirty
+
+    def on_item_changed(self, state: CollectionState, item_name: str):
+        """Called by the world whenever the state collects or removes an item of the player."""
+        self.clear_state_cache(state)
+        dirty = self.dirty_spots.get(state)
+        if dirty is not None:
+            dirty.update(self.get_spots_reading(item_name))
+
+    def compile(self, area: Optional[dict]) -> RequireNode:
         # if it's not a usable object of some sort, default to true
         if not area:
-            return True
+            return RequireConstant(True)
 
         # don't require the "requires" key for locations and regions if they don't need to use it
         if "requires" not in area.keys():
-            return True
+            return RequireConstant(True)
 
         if isinstance(area["requires"], str):
-            return checkRequireStringForArea(state, area)
+            return self.compile_string(area["requires"], area)
         else:  # item access is in dict form
-            return checkRequireDictForArea(state, area)
+            return self.compile_list(area["requires"], area)
 
-    used_location_names = []
-    # Region access rules
-    for region in regionMap.keys():
-        used_location_names.extend([l.name for l in multiworld.get_region(region, player).locations])
-        if region != "Menu":
-            for exitRegion in multiworld.get_region(region, player).entrances:
-                def fullRegionCheck(state: CollectionState, region=regionMap[region], region_name=exitRegion.name):
-                    region['name'] = region_name
-                    region['is_region'] = True
+    def compile_string(self, requires: str, area: dict, depth: int = 0) -> RequireNode:
+        if requires == "":
+            return RequireConstant(True)
 
-                    return fullLocationOrRegionCheck(state, region)
+        return self._compile_tokens(self._tokenize(requires, area, depth), area)
 
-                add_rule(world.get_entrance(exitRegion.name), fullRegionCheck)
-            entrance_rules = regionMap[region].get("entrance_requires", {})
-            for e in entrance_rules:
-                entrance = world.get_entrance(f'{e}To{region}')
-                add_rule(entrance, lambda state, rule={"requires": entrance_rules[e]}: fullLocationOrRegionCheck(state, rule))
-            exit_rules = regionMap[region].get("exit_requires", {})
-            for e in exit_rules:
-                exit = world.get_entrance(f'{region}To{e}')
-                add_rule(exit, lambda state, rule={"requires": exit_rules[e]}: fullLocationOrRegionCheck(state, rule))
+    def splice_results(self, tokens: list[tuple[str, Any]], results: tuple[bool|str, ...], area: dict) -> RequireNode:
+        """Compile the tokens of a RequireSplice with the results of its functions written in place of them."""
+        spliced_tokens = []
+        results = iter(results)
 
-    # Location access rules
-    for location in world.location_table:
-        if location["name"] not in used_location_names:
-            continue
+        for kind, value in tokens:
+            if kind != "splice":
+                spliced_tokens.append((kind, value))
+                continue
 
-        locFromWorld = multiworld.get_location(location["name"], player)
+            result = next(results)
+            if isinstance(result, bool):
+                spliced_tokens.append(("constant", RequireConstant(result)))
+            else:
+                spliced_tokens.extend(self._tokenize(result, area, value.depth + 1))
 
-        locationRegion = regionMap[location["region"]] if "region" in location else None
+        return self._compile_tokens(spliced_tokens, area)
 
-        if locationRegion:
-            locationRegion['name'] = location['region']
-            locationRegion['is_region'] = True
+    def _compile_tokens(self, tokens: list[tuple[str, Any]], area: dict) -> RequireNode:
+        if any(kind == "splice" for kind, _ in tokens):
+            # the requires can only be read once the functions returned
+            return RequireSplice(self, area, tokens)
 
-        if "requires" in location: # Location has requires, check them alongside the region requires
-            def checkBothLocationAndRegion(state: CollectionState, location=location, region=locationRegion):
-                locationCheck = fullLocationOrRegionCheck(state, location)
-                regionCheck = True # default to true unless there's a region with requires
+        position, node = self._parse_expression(tokens, 0, area)
 
-                if region:
-                    regionCheck = fullLocationOrRegionCheck(state, region)
+        if position < len(tokens):
+            # only an unmatched closing parenthesis can stop the expression early
+            raise construct_logic_error(area, LogicErrorSource.INFIX_TO_POSTFIX)
 
-                return locationCheck and regionCheck
+        return self.optimize(node)
 
-            set_rule(locFromWorld, checkBothLocationAndRegion)
-        elif "region" in location: # Only region access required, check the location's region's requires
-            def fullRegionCheck(state, region=locationRegion):
-                return fullLocationOrRegionCheck(state, region)
+    # this is only called when the area (think, location or region) has a "requires" field that is a dict or list
+    def compile_list(self, requires: list, area: dict) -> RequireNode:
+        or_groups = []
+        items = []
 
-            set_rule(locFromWorld, fullRegionCheck)
-        else: # No location region and no location requires? It's accessible.
-            def allRegionsAccessible(state):
-                return True
+        for item in requires:
+            # if the require entry is an object with "or" or a list of items, treat it as a standalone require of its own
+            if (isinstance(item, dict) and "or" in item and isinstance(item["or"], list)) or (isinstance(item, list)):
+                or_items = item
 
-            set_rule(locFromWorld, allRegionsAccessible)
+                if isinstance(item, dict):
+                    or_items = item["or"]
 
-    # Victory requirement
-    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
+                or_groups.append(RequireAnd([self._compile_list_item(or_item) for or_item in or_items]))
+            else:
+                items.append(self._compile_list_item(item))
+
+        if not or_groups:
+            return self.optimize(RequireAnd(items))
+
+        # any fully met standalone group grants access, and so does having every other item
+        return self.optimize(RequireOr(or_groups + [RequireAnd(items)]))
+
+    def optimize(self, node: RequireNode) -> RequireNode:
+        """Fold everything already known for this player into constants, flatten nested AND/OR,
+        check plain items together and order the operands cheapest first,
+        so the short-circuit skips the category sums and function calls whenever it can."""
+        if isinstance(node, RequireNot):
+            node.operand = self.optimize(node.operand)
+            if isinstance(node.operand, RequireConstant):
+                return RequireConstant(not node.operand.value)
+            return node
+
+        if isinstance(node, (RequireItem, RequireCategory)) and node.item_count <= 0:
+            # a count of 0 is always met, except for an empty category
+            return RequireConstant(not isinstance(node, RequireCategory) or len(node.category_items) > 0)
+
+        if isinstance(node, RequireCategory) and not node.category_items:
+            return RequireConstant(False)
+
+        if not isinstance(node, (RequireAnd, RequireOr)):
+            return node
+
+        node_type = type(node)
+        # True for an OR or False for an AND decides the whole node, the other value can be dropped
+        deciding_value = node_type is RequireOr
+        operands = []
+        for operand in node.operands:
+            operand = self.optimize(operand)
+            if isinstance(operand, RequireConstant):
+                if operand.value == deciding_value:
+                    return RequireConstant(deciding_value)
+                continue
+            if type(operand) is node_type:
+                operands.extend(operand.operands)
+            else:
+                operands.append(operand)
 
-    def convert_req_function_args(state: CollectionState, func, args: list[str], areaName: str):
-        parameters = inspect.signature(func).parameters
-        knownParameters = [World, 'ManualWorld', MultiWorld, CollectionState]
-        index = -1
-        for parameter in parameters.values():
-            target_type = parameter.annotation
-            index += 1
-            if target_type in knownParameters:
+        plain_items = [operand for operand in operands if isinstance(operand, RequireItem)
+                       and operand.item_count == 1]
+        if len(plain_items) > 1:
+            item_names = [operand.item_name for operand in plain_items]
+            grouped = RequireAnyItem(self.player, item_names) if node_type is RequireOr else RequireAllItems(self.player, item_names)
+            operands = [grouped] + [operand for operand in operands if operand not in plain_items]
+
+        if not operands:
+            return RequireConstant(not deciding_value)
+
+        if len(operands) == 1:
+            return operands[0]
+
+        operands.sort(key=lambda operand: operand.cost())
+        return node_type(operands)
+
+    def _compile_list_item(self, item: str) -> RequireNode:
+        item_parts = item.split(":")
+        item_name = item
+        item_count = 1
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0]
+            item_count = int(item_parts[1])
+
+        return RequireItem(self.player, item_name, item_count)
+
+    def _tokenize(self, requires: str, area: dict, depth: int) -> list[tuple[str, Any]]:
+        tokens = []
+        position = 0
+
+        while position < len(requires):
+            match = _require_token_pattern.match(requires, position)
+
+            if match is None:
+                # anything that isn't part of the requires syntax has always been skipped
+                position += 1
+                continue
+
+            position = match.end()
+            kind = match.lastgroup
+
+            if kind == "function":
+                if depth > self.world.rules_functions_maximum_recursion:
+                    area_type, area_name = _describe_area(area)
+                    found_functions = re.findall(r'\{(\w+)\((.*?)\)\}', requires)
+                    raise RecursionError(f'One or more functions in {area_type} "{area_name}"\'s requires looped too many time (maximum recursion is {self.world.rules_functions_maximum_recursion}) \
+                                         \n    As of this Exception the following function(s) are waiting to run: {[f[0] for f in found_functions]} \
+                                         \n    And the currently processed requires look like this: "{requires}"')
+                function = self._compile_function(match.group("func_name"), match.group("func_args"), area, depth)
+
+                if self.is_option_only(function.func):
+                    # resolved once for this player, without any state
+                    result = function.evaluate(None)
+                    if isinstance(result, bool):
+                        tokens.append(("constant", RequireConstant(result)))
+                    else:
+                        tokens.extend(self._tokenize(result, area, depth + 1))
+                elif self.returns_bool(function.func):
+                    tokens.append((kind, function))
+                else:
+                    tokens.append(("splice", function))
+            elif kind == "item":
+                tokens.append((kind, self._compile_item(match.group("item"), area)))
+            elif kind == "constant":
+                tokens.append((kind, RequireConstant(match.group("constant") == "1")))
+            elif kind == "operator":
+                tokens.append((kind, match.group("operator").upper()))
+            else:
+                tokens.append((kind, None))
+
+        return tokens
+
+    def _parse_expression(self, tokens: list[tuple[str, Any]], position: int, area: dict) -> tuple[int, RequireNode]:
+        # AND and OR share the same precedence and are read from left to right
+        position, node = self._parse_operand(tokens, position, area)
+
+        while position < len(tokens) and tokens[position][0] == "operator":
+            operator = tokens[position][1]
+            position, right = self._parse_operand(tokens, position + 1, area)
+            node_type = RequireAnd if operator == "AND" else RequireOr
+
+            if isinstance(node, node_type):
+                node.operands.append(right)
+            else:
+                node = node_type([node, right])
+
+        if position < len(tokens) and tokens[position][0] != "close":
+            # two values without an AND/OR between them
+            raise construct_logic_error(area, LogicErrorSource.EVALUATE_STACK_SIZE)
+
+        return position, node
+
+    def _parse_operand(self, tokens: list[tuple[str, Any]], position: int, area: dict) -> tuple[int, RequireNode]:
+        if position >= len(tokens):
+            raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+
+        kind, value = tokens[position]
+
+        if kind == "not":
+            position, operand = self._parse_operand(tokens, position + 1, area)
+            return position, RequireNot(operand)
+
+        if kind == "open":
+            position, node = self._parse_expression(tokens, position + 1, area)
+            # a missing closing parenthesis at the very end has always been tolerated
+            if position < len(tokens):
+                position += 1
+            return position, node
+
+        if kind in ("function", "item", "constant"):
+            return position + 1, value
+
+        raise construct_logic_error(area, LogicErrorSource.EVALUATE_POSTFIX)
+
+    def _compile_item(self, item: str, area: dict) -> RequireNode:
+        require_category = '|@' in item
+
+        item = item.lstrip('|@$').rstrip('|')
+
+        item_parts = item.split(":")  # type: list[str]
+        item_name = item
+        item_count = "1"
+
+        if len(item_parts) > 1:
+            item_name = item_parts[0].strip()
+            item_count = item_parts[1].strip()
+
+        # rules are compiled after create_items, so all/half/N% can be turned into a number right away
+        if _is_relative_count(item_count):
+            if require_category:
+                total = self.world.get_category_counts(self.player, only_progression=True).get(item_name, 0)
+            else:
+                total = self.world.get_item_counts(self.player, only_progression=True).get(item_name, 0)
+            item_count = _resolve_relative_count(item_count, total)
+        else:
+            try:
+                item_count = int(item_count)
+            except ValueError as e:
+                raise ValueError(f"Invalid item count `{item_name}` in {area}.") from e
+
+        if require_category:
+            category_items = self.world.item_category_to_item_names.get(item_name, ())
+            return RequireCategory(self.player, item_name, category_items, item_count)
+
+        return RequireItem(self.player, item_name, item_count)
+
+    def _compile_function(self, func_name: str, func_args: str, area: dict, depth: int) -> RequireFunction:
+        func = globals().get(func_name)
+
+        if func is None:
+            func = getattr(Rules, func_name, None)
+
+        if not callable(func):
+            area_type, area_name = _describe_area(area)
+            raise ValueError(f'Invalid function "{func_name}" in {area_type} "{area_name}".')
+
+        return RequireFunction(self, area, func, func_name, func_args, depth)
+
+    def returns_bool(self, func) -> bool:
+        """Is the function annotated to return a bool? Its calls are then checked on their own,
+        the result of any other function is read as part of the requires around it."""
+        return inspect.signature(func).return_annotation in (bool, "bool")
+
+    def is_option_only(self, func) -> bool:
+        """Was the function marked with option_only_requirement? Only those are resolved when compiling, whatever their parameters are."""
+        return getattr(func, "option_only_requirement", False)
+
+    def get_binding_plan(self, func) -> list[tuple[inspect.Parameter, Optional[str]]]:
+        """The parameters of a requirement function, each with what gets injected into it
+        ("world", "multiworld", "state", "player" or None when the value comes from the requires). Computed once per function."""
+        plan = self.binding_plans.get(func)
+        if plan is None:
+            plan = []
+            for parameter in inspect.signature(func).parameters.values():
+                target_type = parameter.annotation
+                injected = None
                 if target_type in [World, 'ManualWorld']:
-                    args.insert(index, world)
+                    injected = "world"
                 elif target_type == MultiWorld:
-                    args.insert(index, multiworld)
+                    injected = "multiworld"
                 elif target_type == CollectionState:
-                    args.insert(index, state)
+                    injected = "state"
+                elif parameter.name.lower() == "player":
+                    injected = "player"
+                plan.append((parameter, injected))
+            self.binding_plans[func] = plan
+        return plan
+
+    def bind_function_args(self, func, raw_args: str, area: dict) -> tuple[list[Any], tuple[int, ...]]:
+        """Converts the arguments written in the requires for the function and injects the world, multiworld and player.\n
+        Returns the arguments and the positions where the state has to be placed before each call."""
+        _, areaName = _describe_area(area)
+        args: list[Any] = raw_args.split(",")
+        if args == ['']:
+            args.pop()
+
+        state_indexes = []
+        injected_values = {"world": self.world, "multiworld": self.multiworld, "player": self.player}
+        index = -1
+        for parameter, injected in self.get_binding_plan(func):
+            target_type = parameter.annotation
+            index += 1
+            if injected == "state":
+                args.insert(index, None)
+                state_indexes.append(index)
                 continue
-            if parameter.name.lower() == "player":
-                args.insert(index, player)
+            if injected is not None:
+                args.insert(index, injected_values[injected])
                 continue
 
             if index < len(args) and args[index] != "":
@@ -387,8 +807,74 @@ def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
 
             args[index] = value
 
+        return args, tuple(state_indexes)
+
+def set_rules(world: "ManualWorld", multiworld: MultiWorld, player: int):
+    # every "requires" is compiled once here, the access rules then only have to check the state
+    compiler = world.requires_compiler
+
+    compiled_regions: dict[str, RequireNode] = {}
+
+    def compileRegion(region_name: str) -> RequireNode:
+        if region_name not in compiled_regions:
+            region = {**regionMap[region_name], "name": region_name, "is_region": True}
+            rule = compiler.compile(region)
+            if not isinstance(rule, RequireConstant) and _is_cacheable(rule):
+                rule = RequireRegion(compiler, region_name, rule)
+            compiled_regions[region_name] = rule
+
+        return compiled_regions[region_name]
+
+    def addCompiledRule(spot, rule: RequireNode):
+        # a requires that folded to always met doesn't need to be added at all
+        if isinstance(rule, RequireConstant) and rule.value:
+            return
+        add_rule(spot, rule)
+        compiler.register_rule(spot, rule)
+
+    def setCompiledRule(spot, rule: RequireNode):
+        set_rule(spot, rule)
+        compiler.register_rule(spot, rule)
+
+    used_location_names = set()
+    # Region access rules
+    for region in regionMap.keys():
+        used_location_names.update([l.name for l in multiworld.get_region(region, player).locations])
+        if region != "Menu":
+            for exitRegion in multiworld.get_region(region, player).entrances:
+                addCompiledRule(world.get_entrance(exitRegion.name), compileRegion(region))
+            entrance_rules = regionMap[region].get("entrance_requires", {})
+            for e in entrance_rules:
+                entrance = world.get_entrance(f'{e}To{region}')
+                addCompiledRule(entrance, compiler.compile({"requires": entrance_rules[e]}))
+            exit_rules = regionMap[region].get("exit_requires", {})
+            for e in exit_rules:
+                exit = world.get_entrance(f'{region}To{e}')
+                addCompiledRule(exit, compiler.compile({"requires": exit_rules[e]}))
+
+    # Location access rules
+    for location in world.location_table:
+        if location["name"] not in used_location_names:
+            continue
+
+        locFromWorld = multiworld.get_location(location["name"], player)
+
+        if "requires" in location: # Location has requires, check them alongside the region requires
+            if "region" in location:
+                setCompiledRule(locFromWorld, compiler.optimize(RequireAnd([compiler.compile(location), compileRegion(location["region"])])))
+            else:
+                setCompiledRule(locFromWorld, compiler.compile(location))
+        elif "region" in location: # Only region access required, check the location's region's requires
+            setCompiledRule(locFromWorld, compileRegion(location["region"]))
+        else: # No location region and no location requires? It's accessible.
+            setCompiledRule(locFromWorld, RequireConstant(True))
+
+    # Victory requirement
+    multiworld.completion_condition[player] = lambda state: state.has("__Victory__", player)
+
 
-def ItemValue(state: CollectionState, player: int, valueCount: str):
+@cached_requirement
+def ItemValue(state: CollectionState, player: int, valueCount: str) -> bool:
     """When passed a string with this format: 'valueName:int',
     this function will check if the player has collect at least 'int' valueName worth of items\n
     eg. {ItemValue(Coins:12)} will check if the player has collect at least 12 coins worth of items
@@ -403,6 +889,7 @@ def ItemValue(state: CollectionState, player: int, valueCount: str):
 
 
 # Two useful functions to make require work if an item is disabled instead of making it inaccessible
+@option_only_requirement
 def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None):
     """Check if the passed item (with or without ||) is enabled, then this returns |item:count|
     where count is clamped to the maximum number of said item in the itempool.\n
@@ -431,8 +918,8 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
     if require_type == 'category':
         if item_count.isnumeric():
             #Only loop if we can use the result to clamp
-            category_items = [item for item in world.item_name_to_item.values() if "category" in item and item_name in item["category"]]
-            category_items_counts = sum([items_counts.get(category_item["name"], 0) for category_item in category_items])
+            category_items = world.item_category_to_item_names.get(item_name, ())
+            category_items_counts = sum([items_counts.get(category_item, 0) for category_item in category_items])
             item_count = clamp(int(item_count), 0, category_items_counts)
         return f"|@{item_name}:{item_count}|"
     elif require_type == 'item':
@@ -442,6 +929,7 @@ def OptOne(world: "ManualWorld", item: str, items_counts: Optional[dict] = None)
         return f"|{item_name}:{item_count}|"
 
 # OptAll check the passed require string and loop every item to check if they're enabled,
+@option_only_requirement
 def OptAll(world: "ManualWorld", requires: str):
     """Check the passed require string and loop every item to check if they're enabled,
     then returns the require string with items counts adjusted using OptOne\n
@@ -469,20 +957,23 @@ def OptAll(world: "ManualWorld", requires: str):
     return requires_list
 
 # Rule to expose the can_reach_location core function
-def canReachLocation(state: CollectionState, player: int, location: str):
+def canReachLocation(state: CollectionState, player: int, location: str) -> bool:
     """Can the player reach the given location?"""
     if state.can_reach_location(location, player):
         return True
     return False
 
+@option_only_requirement
 def YamlEnabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option enabled?"""
     return is_option_enabled(multiworld, player, param)
 
+@option_only_requirement
 def YamlDisabled(multiworld: MultiWorld, player: int, param: str) -> bool:
     """Is a yaml option disabled?"""
     return not is_option_enabled(multiworld, player, param)
 
+@option_only_requirement
 def YamlCompare(world: "ManualWorld", multiworld: MultiWorld, state: CollectionState, player: int, args: str, skipCache: bool = False) -> bool:
     """Is a yaml option's value compared using {comparator} to the requested value
     \nFormat it like {YamlCompare(OptionName==value)}
@@ -1,8 +1,10 @@
 from base64 import b64encode
+from itertools import chain
+from copy import copy
 import logging
 import os
 import json
-from typing import Callable, Optional, Counter
+from typing import Callable, Optional, Counter, Iterable
 import webbrowser
 
 import Utils
@@ -12,24 +14,24 @@ from worlds.LauncherComponents import Component, SuffixIdentifier, components, T
 from .Data import item_table, location_table, region_table, category_table
 from .Game import game_name, filler_item_name, starting_items
 from .Meta import world_description, world_webworld, enable_region_diagram
-from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names
-from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups
+from .Locations import location_id_to_name, location_name_to_id, location_name_to_location, location_name_groups, victory_names, location_name_to_forbidden_item_names, location_name_to_eligible_item_names
+from .Items import item_id_to_name, item_name_to_id, item_name_to_item, item_name_groups, item_category_to_item_names, item_category_to_real_item_names
 from .DataValidation import runGenerationDataValidation, runPreFillDataValidation
 
 from .Regions import create_regions
 from .Items import ManualItem
-from .Rules import set_rules
+from .Rules import set_rules, RequiresCompiler
 from .Options import manual_options_data
-from .Helpers import is_item_enabled, get_option_value, get_items_for_player, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
+from .Helpers import is_item_enabled, build_enablement_table, invalidate_enablement_table, EnablementTable, get_option_value, reset_items_by_player_cache, get_items_for_player, remove_specific_items, resolve_yaml_option, format_state_prog_items_key, ProgItemsCat
 
-from BaseClasses import CollectionState, ItemClassification, Item
+from BaseClasses import CollectionState, ItemClassification, Item, MultiWorld
 from Options import PerGameCommonOptions
 from worlds.AutoWorld import World
 
 from .hooks.World import \
     hook_get_filler_item_name, before_create_regions, after_create_regions, \
     before_create_items_all, before_create_items_starting, before_create_items_filler, after_create_items, \
-    before_create_item, after_create_item, \
+    before_create_item, after_create_item, after_create_item_copies, \
     before_set_rules, after_set_rules, \
     before_generate_basic, after_generate_basic, \
     before_fill_slot_data, after_fill_slot_data, before_write_spoiler, \
@@ -37,6 +39,15 @@ from .hooks.World import \
     after_collect_item, after_remove_item
 from .hooks.Data import hook_interpret_slot_data
 
+def _template_create_item_hook(value, world, multiworld, player):
+    return value
+
+# while before_create_item and after_create_item only hand back what they get, like the template ones,
+# create_item gives the same item for every copy of a name and only has to run once, see ManualWorld.create_item_copies
+_create_item_hooks_unchanged = all(getattr(hook, "__code__", None) is not None
+                                   and hook.__code__.co_code == _template_create_item_hook.__code__.co_code
+                                   for hook in (before_create_item, after_create_item))
+
 class ManualWorld(World):
     __doc__ = world_description
     game: str = game_name
@@ -55,12 +66,19 @@ class ManualWorld(World):
     item_name_to_id = item_name_to_id
     item_name_to_item = item_name_to_item
     item_name_groups = item_name_groups
+    item_category_to_item_names = item_category_to_item_names
 
     filler_item_name = filler_item_name
 
-    item_counts: dict[int, Counter[str]] = {}
-    item_counts_progression: dict[int, Counter[str]] = {}
+    # The real item counts of the world's player, set at the end of create_items.
+    # They're set on each world in __init__ so they aren't shared by every world of this class.
+    item_counts: dict[int, Counter[str]]
+    item_counts_progression: dict[int, Counter[str]]
+    category_counts: dict[int, Counter[str]]
+    category_counts_progression: dict[int, Counter[str]]
     start_inventory = {}
+    requires_compiler: RequiresCompiler
+    enablement_table: Optional[EnablementTable] = None
 
     location_id_to_name = location_id_to_name
     location_name_to_id = location_name_to_id
@@ -71,6 +89,19 @@ class ManualWorld(World):
     # UT (the universal-est of trackers) can now generate without a YAML
     ut_can_gen_without_yaml = False  # Temporary disable until we fix the bugs with it
 
+    def __init__(self, multiworld: MultiWorld, player: int):
+        super().__init__(multiworld, player)
+        self.item_counts = {}
+        self.item_counts_progression = {}
+        self.category_counts = {}
+        self.category_counts_progression = {}
+        # value name -> {item name: value count} of the player's items, see get_items_with_value
+        self.item_values: dict[int, dict[str, dict[str, int]]] = {}
+        # the grouped items and precollected item count each value index was built from, see get_item_value_index
+        self.item_values_source: dict[int, tuple[Optional[list[Item]], int]] = {}
+        # created here so hooks can compile and check requires before set_rules, all/half/N% counts still need create_items to have run
+        self.requires_compiler = RequiresCompiler(self, multiworld, player)
+
     def get_filler_item_name(self) -> str:
         return hook_get_filler_item_name(self, self.multiworld, self.player) or self.filler_item_name
 
@@ -86,14 +117,21 @@ class ManualWorld(World):
                 regen = True
 
         regen = hook_interpret_slot_data(self, self.player, slot_data) or regen
+        if regen:
+            invalidate_enablement_table(self)
         return regen
 
     @classmethod
     def stage_assert_generate(cls, multiworld) -> None:
         runGenerationDataValidation(cls)
 
+    def generate_early(self) -> None:
+        build_enablement_table(self)
 
     def create_regions(self):
+        # other worlds can change the items between the steps of this world, so get_items_for_player groups them again in each step
+        reset_items_by_player_cache(self.multiworld)
+
         before_create_regions(self, self.multiworld, self.player)
 
         create_regions(self, self.multiworld, self.player)
@@ -108,8 +146,12 @@ class ManualWorld(World):
             ManualItem("__Victory__", ItemClassification.progression, None, player=self.player))
 
         after_create_regions(self, self.multiworld, self.player)
+        # items placed outside of the item pool aren't noticed by get_items_for_player on their own
+        reset_items_by_player_cache(self.multiworld)
 
     def create_items(self):
+        reset_items_by_player_cache(self.multiworld)
+
         # Generate item pool
         pool: list[Item] = []
         traps = []
@@ -138,9 +180,7 @@ class ManualWorld(World):
             total_created = 0
             if type(configs) is int:
                 total_created = configs
-                for _ in range(configs):
-                    new_item = self.create_item(name)
-                    pool.append(new_item)
+                pool += self.create_item_copies(name, configs)
             elif type(configs) is dict:
                 for cat, count in configs.items():
                     total_created += count
@@ -157,9 +197,7 @@ class ManualWorld(World):
                         except Exception as ex:
                             raise Exception(f"Item override '{cat}' for {name} improperly defined\n\n{type(ex).__name__}:{ex}")
 
-                    for _ in range(count):
-                        new_item = self.create_item(name, true_class)
-                        pool.append(new_item)
+                    pool += self.create_item_copies(name, count, true_class)
             else:
                 raise Exception(f"Item override for {name} improperly defined")
 
@@ -196,6 +234,12 @@ class ManualWorld(World):
         items_started: list[Item] = []
 
         if starting_items:
+            # the pool items by name, along with their pool position, so each block only goes through the items it can start with
+            pool_items_by_name: dict[str, list[tuple[int, Item]]] = {}
+            for index, item in enumerate(pool):
+                pool_items_by_name.setdefault(item.name, []).append((index, item))
+            started_item_ids: set[int] = set()
+
             for starting_item_block in starting_items:
                 if not resolve_yaml_option(self.multiworld, self.player, starting_item_block):
                     continue
@@ -207,30 +251,34 @@ class ManualWorld(World):
                     if len(matching_items) == 0:
                         continue
 
-                # start with the full pool of items
-                items = pool
+                # if the setting lists specific item categories, limit the items to ones that have any of those categories
+                if "item_categories" in starting_item_block:
+                    item_names = set().union(*(item_category_to_real_item_names.get(c, ()) for c in starting_item_block["item_categories"]))
 
                 # if the setting lists specific item names, limit the items to just those
-                if "items" in starting_item_block:
-                    items = [item for item in pool if item.name in starting_item_block["items"]]
+                elif "items" in starting_item_block:
+                    item_names = set(starting_item_block["items"])
 
-                # if the setting lists specific item categories, limit the items to ones that have any of those categories
-                if "item_categories" in starting_item_block:
-                    items_in_categories = [item["name"] for item in self.item_name_to_item.values() if "category" in item and len(set(starting_item_block["item_categories"]).intersection(item["category"])) > 0]
-                    items = [item for item in pool if item.name in items_in_categories]
+                # otherwise start with the full pool of items
+                else:
+                    item_names = pool_items_by_name.keys()
 
-                self.random.shuffle(items)
+                candidates = [entry for name in item_names for entry in pool_items_by_name.get(name, [])
+                              if id(entry[1]) not in started_item_ids]
+                items = [item for _, item in sorted(candidates, key=lambda entry: entry[0])]
 
-                # if the setting lists a specific number of random items that should be pulled, only use a subset equal to that number
+                # if the setting lists a specific number of random items that should be pulled, only pick that many
                 if "random" in starting_item_block:
-                    items = items[0:starting_item_block["random"]]
+                    items = self.random.sample(items, max(0, min(starting_item_block["random"], len(items))))
 
                 for starting_item in items:
                     items_started.append(starting_item)
+                    started_item_ids.add(id(starting_item))
                     self.multiworld.push_precollected(starting_item)
-                    pool.remove(starting_item)
 
-        self.start_inventory = {i.name: items_started.count(i) for i in items_started}
+            remove_specific_items(pool, items_started)
+
+        self.start_inventory = dict(Counter(i.name for i in items_started))
 
         pool = before_create_items_filler(pool, self, self.multiworld, self.player)
         pool = self.adjust_filler_items(pool, traps)
@@ -239,10 +287,11 @@ class ManualWorld(World):
         # need to put all of the items in the pool so we can have a full state for placement
         # then will remove specific item placements below from the overall pool
         self.multiworld.itempool += pool
+        reset_items_by_player_cache(self.multiworld)
 
-        real_pool = pool + items_started
-        self.item_counts[self.player] = self.get_item_counts(pool=real_pool)
-        self.item_counts_progression[self.player] = self.get_item_counts(pool=real_pool, only_progression=True)
+        self.item_counts[self.player], self.item_counts_progression[self.player] = self.count_items(chain(pool, items_started))
+        self.category_counts[self.player] = self.count_categories(self.item_counts[self.player])
+        self.category_counts_progression[self.player] = self.count_categories(self.item_counts_progression[self.player])
 
     def create_item(self, name: str, class_override: Optional['ItemClassification']=None) -> Item:
         name = before_create_item(name, self, self.multiworld, self.player)
@@ -271,6 +320,21 @@ class ManualWorld(World):
 
         return item_object
 
+    def create_item_copies(self, name: str, count: int, class_override: Optional['ItemClassification']=None) -> list[Item]:
+        """Create count copies of an item, the after_create_item_copies hook then gets every copy at once.\n
+        While the create_item hooks are unchanged, create_item only runs for the first copy and the others are copies of it."""
+        if count <= 0:
+            return []
+
+        if not _create_item_hooks_unchanged:
+            # changed hooks could give each copy something different
+            items = [self.create_item(name, class_override) for _ in range(count)]
+        else:
+            first_item = self.create_item(name, class_override)
+            items = [first_item] + [copy(first_item) for _ in range(count - 1)]
+
+        return after_create_item_copies(items, self, self.multiworld, self.player)
+
     # Item Value need a tweaked collect and remove:
     def collect(self, state: CollectionState, item: Item) -> bool:
         change = super().collect(state, item)
@@ -279,6 +343,8 @@ class ManualWorld(World):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] += int(value)
         after_collect_item(self, state, change, item)
+        if change:
+            self.requires_compiler.on_item_changed(state, item.name)
         return change
 
     def remove(self, state: CollectionState, item: Item) -> bool:
@@ -288,9 +354,13 @@ class ManualWorld(World):
             for key, value in manual_item["value"].items():
                 state.prog_items[item.player][format_state_prog_items_key(ProgItemsCat.VALUE, key)] -= int(value)
         after_remove_item(self, state, change, item)
+        if change:
+            self.requires_compiler.on_item_changed(state, item.name)
         return change
 
     def set_rules(self):
+        reset_items_by_player_cache(self.multiworld)
+
         before_set_rules(self, self.multiworld, self.player)
 
         set_rules(self, self.multiworld, self.player)
@@ -298,59 +368,51 @@ class ManualWorld(World):
         after_set_rules(self, self.multiworld, self.player)
 
     def generate_basic(self):
+        reset_items_by_player_cache(self.multiworld)
+
         before_generate_basic(self, self.multiworld, self.player)
 
         # Handle item forbidding
-        manual_locations_with_forbid = {location['name']: location for location in location_name_to_location.values() if "dont_place_item" in location or "dont_place_item_category" in location}
-        locations_with_forbid = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_forbid.keys()]
-        for location in locations_with_forbid:
-            manual_location = manual_locations_with_forbid[location.name]
-            forbidden_item_names = []
-
-            if manual_location.get("dont_place_item"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if i["name"] in manual_location["dont_place_item"]])
-
-            if manual_location.get("dont_place_item_category"):
-                forbidden_item_names.extend([i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])])
-
+        for location in self.multiworld.get_unfilled_locations(player=self.player):
+            forbidden_item_names = location_name_to_forbidden_item_names.get(location.name)
             if forbidden_item_names:
-                forbid_items_for_player(location, set(forbidden_item_names), self.player)
+                forbid_items_for_player(location, forbidden_item_names, self.player)
 
         # Handle specific item placements using fill_restrictive
-        manual_locations_with_placements = {location['name']: location for location in location_name_to_location.values() if "place_item" in location or "place_item_category" in location}
-        locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in manual_locations_with_placements.keys()]
+        locations_with_placements = [l for l in self.multiworld.get_unfilled_locations(player=self.player) if l.name in location_name_to_eligible_item_names]
+        placed_items: list[Item] = []
+        placed_item_ids: set[int] = set()
+
+        # the player's pool items that some placement could use, by name, with their pool position to keep the pool order
+        items_by_name: dict[str, list[tuple[int, Item]]] = {}
+        if locations_with_placements:
+            wanted_item_names = set().union(*(location_name_to_eligible_item_names[l.name] for l in locations_with_placements))
+            for index, item in enumerate(self.multiworld.itempool):
+                if item.player == self.player and item.name in wanted_item_names:
+                    items_by_name.setdefault(item.name, []).append((index, item))
+
         for location in locations_with_placements:
-            manual_location = manual_locations_with_placements[location.name]
-            eligible_items = []
-            eligible_item_names = []
-            forbidden_item_names = []
+            manual_location = location_name_to_location[location.name]
+            eligible_item_names = location_name_to_eligible_item_names[location.name]
+            forbidden_item_names = location_name_to_forbidden_item_names.get(location.name)
             place_messages = []
             forbid_messages = []
 
-            #First we get possible items names
             if manual_location.get("place_item"):
-                eligible_item_names += manual_location["place_item"]
                 place_messages.append('", "'.join(manual_location["place_item"]))
 
             if manual_location.get("place_item_category"):
-                eligible_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["place_item_category"])]
                 place_messages.append('", "'.join(manual_location["place_item_category"]) + " category(ies)")
 
-            # Second we check for forbidden items names
             if manual_location.get("dont_place_item"):
-                forbidden_item_names += manual_location["dont_place_item"]
                 forbid_messages.append('", "'.join(manual_location["dont_place_item"]) + ' items')
 
             if manual_location.get("dont_place_item_category"):
-                forbidden_item_names += [i["name"] for i in item_name_to_item.values() if "category" in i and set(i["category"]).intersection(manual_location["dont_place_item_category"])]
                 forbid_messages.append('", "'.join(manual_location["dont_place_item_category"]) + ' category(ies)')
 
-            # If we forbid some names, check for those in the possible names and remove them
-            if forbidden_item_names:
-                eligible_item_names = [name for name in eligible_item_names if name not in forbidden_item_names]
-
-            if eligible_item_names:
-                eligible_items = [item for item in self.multiworld.itempool if item.player == self.player and item.name in eligible_item_names]
+            candidates = [entry for name in eligible_item_names for entry in items_by_name.get(name, [])
+                          if id(entry[1]) not in placed_item_ids]
+            eligible_items = [item for _, item in sorted(candidates, key=lambda entry: entry[0])]
 
             if len(eligible_items) == 0:
                 nl = "\n"
@@ -361,11 +423,14 @@ class ManualWorld(World):
             item_to_place = self.random.choice(eligible_items)
             location.place_locked_item(item_to_place)
 
-            # remove the item we're about to place from the pool so it isn't placed twice
-            self.multiworld.itempool.remove(item_to_place)
+            # the placed items are removed from the pool all at once below, until then they're skipped so they aren't placed twice
+            placed_items.append(item_to_place)
+            placed_item_ids.add(id(item_to_place))
 
+        remove_specific_items(self.multiworld.itempool, placed_items)
 
         after_generate_basic(self, self.multiworld, self.player)
+        reset_items_by_player_cache(self.multiworld)
 
         # Enable this in Meta.json to generate a diagram of your manual.  Only works on 0.4.4+
         if enable_region_diagram:
@@ -373,6 +438,9 @@ class ManualWorld(World):
             visualize_regions(self.multiworld.get_region("Menu", self.player), f"{self.game}_{self.player}.puml")
 
     def pre_fill(self):
+        # the pool can also be changed outside of any world, like when start_inventory_from_pool replaces it
+        reset_items_by_player_cache(self.multiworld)
+
         # DataValidation after all the hooks are done but before fill
         runPreFillDataValidation(self, self.multiworld)
 
@@ -448,32 +516,35 @@ class ManualWorld(World):
             # Filler is only assigned if the item doesn't have any other tags, so it only has to be covered by itself.
             # Skip Balancing is also not covered due to how it's only supported when paired with Progression.
             # As a result, these cover every possible combination can be removed.
-            fillers = [item for item in item_pool if item.classification == ItemClassification.filler]
-            traps = [item for item in item_pool if item.classification == ItemClassification.trap]
-            useful = [item for item in item_pool if item.classification == ItemClassification.useful]
-            # Useful + Trap is classified separately so that it can have a unique priority ranking.
-            useful_traps = [item for item in item_pool if
-                            ItemClassification.progression not in item.classification
-                            and ItemClassification.useful in item.classification
-                            and ItemClassification.trap in item.classification]
-            self.random.shuffle(fillers)
-            self.random.shuffle(traps)
-            self.random.shuffle(useful)
-            self.random.shuffle(useful_traps)
-            for _ in range(0, abs(extras)):
-                popped = None
-                if fillers:
-                    popped = fillers.pop()
-                elif traps:
-                    popped = traps.pop()
-                elif useful:
-                    popped = useful.pop()
-                elif useful_traps:
-                    popped = useful_traps.pop()
-                else:
-                    logging.warning("Could not remove enough non-progression items from the pool.")
+            # One bucket per kind of item that can be removed, in the order they get removed.
+            fillers: list[Item] = []
+            traps_to_remove: list[Item] = []
+            useful: list[Item] = []
+            useful_traps: list[Item] = []
+            for item in item_pool:
+                if item.classification == ItemClassification.filler:
+                    fillers.append(item)
+                elif item.classification == ItemClassification.trap:
+                    traps_to_remove.append(item)
+                elif item.classification == ItemClassification.useful:
+                    useful.append(item)
+                # Useful + Trap is classified separately so that it can have a unique priority ranking.
+                elif ItemClassification.progression not in item.classification \
+                        and ItemClassification.useful in item.classification \
+                        and ItemClassification.trap in item.classification:
+                    useful_traps.append(item)
+
+            # only the items that are removed get picked at random, from the first bucket until it's empty then the next one
+            removed_items = []
+            for bucket in (fillers, traps_to_remove, useful, useful_traps):
+                needed = abs(extras) - len(removed_items)
+                if needed <= 0:
                     break
-                item_pool.remove(popped)
+                removed_items += self.random.sample(bucket, min(needed, len(bucket)))
+
+            if len(removed_items) < abs(extras):
+                logging.warning("Could not remove enough non-progression items from the pool.")
+            remove_specific_items(item_pool, removed_items)
 
         return item_pool
 
@@ -494,11 +565,54 @@ class ManualWorld(World):
         if pool is not None:
             return Counter([i.name for i in pool if not only_progression or i.advancement])
 
+        if player != self.player:
+            # the counts are kept by the world of each player
+            world = self.multiworld.worlds.get(player)
+            if isinstance(world, type(self)):
+                return world.get_item_counts(player, only_progression=only_progression)
+            return Counter()
+
         if only_progression:
             return self.item_counts_progression.get(player, Counter())
         else:
             return self.item_counts.get(player, Counter())
 
+    def get_category_counts(self, player: Optional[int] = None, pool: list[Item] | None = None, only_progression: bool = False) -> Counter[str]:
+        """Returns the player real item counts per item category.\n
+        Works like get_item_counts, so without a pool argument this only works after create_items."""
+        if player is None:
+            player = self.player
+
+        if pool is not None:
+            return self.count_categories(self.get_item_counts(pool=pool, only_progression=only_progression))
+
+        if player != self.player:
+            world = self.multiworld.worlds.get(player)
+            if isinstance(world, type(self)):
+                return world.get_category_counts(player, only_progression=only_progression)
+            return Counter()
+
+        if only_progression:
+            return self.category_counts_progression.get(player, Counter())
+        else:
+            return self.category_counts.get(player, Counter())
+
+    def count_items(self, items: Iterable[Item]) -> tuple[Counter[str], Counter[str]]:
+        """Counts the items by name in a single pass, returns the counts of all the items and the counts of only the progression items."""
+        item_counts: Counter[str] = Counter()
+        item_counts_progression: Counter[str] = Counter()
+        for item in items:
+            item_counts[item.name] += 1
+            if item.advancement:
+                item_counts_progression[item.name] += 1
+
+        return item_counts, item_counts_progression
+
+    def count_categories(self, item_counts: Counter[str]) -> Counter[str]:
+        """Sums item counts (like the ones from get_item_counts) for each item category."""
+        return Counter({category: sum(item_counts.get(item_name, 0) for item_name in item_names)
+                        for category, item_names in self.item_category_to_item_names.items()})
+
 
     def client_data(self):
         return {
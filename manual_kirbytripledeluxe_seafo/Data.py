@@ -2,7 +2,7 @@ import logging
 from typing import Any
 
 from .DataValidation import DataValidation, ValidationError
-from .Helpers import load_data_file as helpers_load_data_file
+from .Helpers import load_data_file as helpers_load_data_file, get_package_hash, load_data_cache, save_data_cache
 
 from .hooks.Data import \
     after_load_game_file, \
@@ -38,28 +38,41 @@ class ManualFile:
         return contents
 
 
-game_table: dict[str, Any] = ManualFile('game.json', dict).load() #dict
-item_table: list[dict[str, Any]] = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
-location_table: list[dict[str, Any]] = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
-event_table: list[dict[str, Any]] = convert_to_list(ManualFile('events.json', list).load(), 'data') #list
-region_table: dict[str, Any] = ManualFile('regions.json', dict).load() #dict
-category_table: dict[str, Any] = ManualFile('categories.json', dict).load() #dict
-option_table: dict[str, Any] = ManualFile('options.json', dict).load() #dict
-meta_table: dict[str, Any] = ManualFile('meta.json', dict).load() #dict
-
-# Removal of schemas in root of tables
-region_table.pop('$schema', '')
-category_table.pop('$schema', '')
-
-# hooks
-game_table = after_load_game_file(game_table)
-item_table = after_load_item_file(item_table)
-location_table = after_load_location_file(location_table)
-event_table = after_load_event_file(event_table)
-region_table = after_load_region_file(region_table)
-category_table = after_load_category_file(category_table)
-option_table = after_load_option_file(option_table)
-meta_table = after_load_meta_file(meta_table)
+# The tables as they are after the load hooks are kept in a snapshot, so they don't have to be parsed again until any data or python file of the apworld changes
+data_hash = get_package_hash()
+
+def load_tables() -> tuple:
+    game_table: dict[str, Any] = ManualFile('game.json', dict).load() #dict
+    item_table: list[dict[str, Any]] = convert_to_list(ManualFile('items.json', list).load(), 'data') #list
+    location_table: list[dict[str, Any]] = convert_to_list(ManualFile('locations.json', list).load(), 'data') #list
+    event_table: list[dict[str, Any]] = convert_to_list(ManualFile('events.json', list).load(), 'data') #list
+    region_table: dict[str, Any] = ManualFile('regions.json', dict).load() #dict
+    category_table: dict[str, Any] = ManualFile('categories.json', dict).load() #dict
+    option_table: dict[str, Any] = ManualFile('options.json', dict).load() #dict
+    meta_table: dict[str, Any] = ManualFile('meta.json', dict).load() #dict
+
+    # Removal of schemas in root of tables
+    region_table.pop('$schema', '')
+    category_table.pop('$schema', '')
+
+    # hooks
+    game_table = after_load_game_file(game_table)
+    item_table = after_load_item_file(item_table)
+    location_table = after_load_location_file(location_table)
+    event_table = after_load_event_file(event_table)
+    region_table = after_load_region_file(region_table)
+    category_table = after_load_category_file(category_table)
+    option_table = after_load_option_file(option_table)
+    meta_table = after_load_meta_file(meta_table)
+
+    return game_table, item_table, location_table, event_table, region_table, category_table, option_table, meta_table
+
+tables = load_data_cache("tables", data_hash)
+if tables is None:
+    tables = load_tables()
+    save_data_cache("tables", data_hash, tables)
+
+game_table, item_table, location_table, event_table, region_table, category_table, option_table, meta_table = tables
 
 # seed all of the tables for validation
 DataValidation.game_table = game_table
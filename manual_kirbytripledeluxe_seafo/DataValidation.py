@@ -1,4 +1,5 @@
 import logging
+import os
 import re
 import json
 from worlds.AutoWorld import World
@@ -19,6 +20,35 @@ class DataValidation():
     region_table: dict[str, Any] = {}
     location_table_with_events: list[dict[str, Any]] = []
     location_name_to_location: dict[str, dict[str, Any]] = {}
+    item_category_to_item_names: dict[str, tuple[str, ...]] = {}
+    # built by buildLookups before the checks run
+    item_names: set[str] = set()
+    item_names_with_events: set[str] = set()
+    item_categories: set[str] = set()
+    requires_tokens: dict[str, list[str]] = {}
+
+    @staticmethod
+    def buildLookups():
+        DataValidation.item_names = {item.get("name") for item in DataValidation.item_table}
+        DataValidation.item_names_with_events = {item.get("name") for item in DataValidation.item_table_with_events}
+        DataValidation.item_categories = {category for item in DataValidation.item_table for category in item.get("category", [])}
+        DataValidation.requires_tokens = {}
+
+    @staticmethod
+    def _getRequiresTokens(requires: str) -> list[str]:
+        """The |item| and |@category| tokens of a requires string, parsed only once for all the checks"""
+        tokens = DataValidation.requires_tokens.get(requires)
+        if tokens is None:
+            tokens = DataValidation.requires_tokens[requires] = re.findall(r'\|[^|]+\|', requires)
+        return tokens
+
+    @staticmethod
+    def _getRequiresJsonTokens(requires: str | list) -> list[str]:
+        """The |item| tokens as they are in the json of a requires"""
+        if isinstance(requires, str):
+            # json escapes characters one by one, so these are the string's tokens escaped the same way
+            return [json.dumps(token)[1:-1] for token in DataValidation._getRequiresTokens(requires)]
+        return re.findall(r'\|[^|]+\|', json.dumps(requires))
 
     @staticmethod
     def checkItemNamesInLocationRequires():
@@ -28,7 +58,7 @@ class DataValidation():
 
             if isinstance(location["requires"], str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', location["requires"]):
+                for item in DataValidation._getRequiresTokens(location["requires"]):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
@@ -42,7 +72,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table_with_events if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in DataValidation.item_category_to_item_names
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by location %s but is misspelled or does not exist." % (item_name, location.get("name")))
@@ -57,7 +87,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names_with_events
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location.get("name")))
@@ -78,7 +108,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == or_item_name]) > 0
+                            item_exists = or_item_name in DataValidation.item_names_with_events
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (or_item_name, location["name"]))
@@ -89,7 +119,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names_with_events
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by location %s but is misspelled or does not exist." % (item_name, location["name"]))
@@ -104,7 +134,7 @@ class DataValidation():
 
             if isinstance(region["requires"], str):
                 # parse user written statement into list of each item
-                for item in re.findall(r'\|[^|]+\|', region["requires"]):
+                for item in DataValidation._getRequiresTokens(region["requires"]):
                     if item.lower() == "or" or item.lower() == "and" or item == ")" or item == "(":
                         continue
                     else:
@@ -118,7 +148,7 @@ class DataValidation():
                                 item_name = item_parts[0]
 
                             item_name = item_name[1:]
-                            item_category_exists = len([item for item in DataValidation.item_table_with_events if item_name in item.get('category', [])]) > 0
+                            item_category_exists = item_name in DataValidation.item_category_to_item_names
 
                             if not item_category_exists:
                                 raise ValidationError("Item category %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -133,7 +163,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names_with_events
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -154,7 +184,7 @@ class DataValidation():
                             if len(or_item_parts) > 1:
                                 or_item_name = or_item_parts[0]
 
-                            item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == or_item_name]) > 0
+                            item_exists = or_item_name in DataValidation.item_names_with_events
 
                             if not item_exists:
                                 raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (or_item_name, region_name))
@@ -165,7 +195,7 @@ class DataValidation():
                         if len(item_parts) > 1:
                             item_name = item_parts[0]
 
-                        item_exists = len([item.get("name") for item in DataValidation.item_table_with_events if item.get("name") == item_name]) > 0
+                        item_exists = item_name in DataValidation.item_names_with_events
 
                         if not item_exists:
                             raise ValidationError("Item %s is required by region %s but is misspelled or does not exist." % (item_name, region_name))
@@ -176,7 +206,7 @@ class DataValidation():
             if "region" not in location or location["region"] in ["Menu", "Manual"]:
                 continue
 
-            region_exists = len([name for name in DataValidation.region_table if name == location["region"]]) > 0
+            region_exists = location["region"] in DataValidation.region_table
 
             if not region_exists:
                 raise ValidationError("Region %s is set for location %s, but the region is misspelled or does not exist." % (location["region"], location["name"]))
@@ -200,6 +230,19 @@ class DataValidation():
 
     @staticmethod
     def checkItemsThatShouldBeRequired():
+        # the first location and region whose requires use each |item| token, the requires are compared as json so we don't have to guess the data type
+        locations_requiring: dict[str, str] = {}
+        for location in DataValidation.location_table_with_events:
+            if "requires" in location:
+                for token in DataValidation._getRequiresJsonTokens(location["requires"]):
+                    locations_requiring.setdefault(token, location.get("name"))
+
+        regions_requiring: dict[str, str] = {}
+        for region_name, region in DataValidation.region_table.items():
+            if "requires" in region:
+                for token in DataValidation._getRequiresJsonTokens(region["requires"]):
+                    regions_requiring.setdefault(token, region_name)
+
         for item in DataValidation.item_table:
             # if the item is already progression, no need to check
             if item.get("progression"):
@@ -228,38 +271,12 @@ class DataValidation():
                 if has_progression:
                     continue
             # check location requires for the presence of item name
-            for location in DataValidation.location_table_with_events:
-                if "requires" not in location:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                location_requires = json.dumps(location["requires"])
-
-                # if boolean, else legacy
-                if isinstance(location_requires, str):
-                    if '|{}|'.format(item.get("name")) in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item.get("name"), location["name"]))
-                else:
-                    if item.get("name") in location_requires:
-                        raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item.get("name"), location["name"]))
+            if '|{}|'.format(item.get("name")) in locations_requiring:
+                raise ValidationError("Item %s is required by location %s, but the item is not marked as progression." % (item.get("name"), locations_requiring['|{}|'.format(item.get("name"))]))
 
             # check region requires for the presence of item name
-            for region_name in DataValidation.region_table:
-                region = DataValidation.region_table[region_name]
-
-                if "requires" not in region:
-                    continue
-
-                # convert to json so we don't have to guess the data type
-                region_requires = json.dumps(region["requires"])
-
-                # if boolean, else legacy
-                if isinstance(region_requires, str):
-                    if '|{}|'.format(item.get("name")) in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item.get("name"), region_name))
-                else:
-                    if item.get("name") in region_requires:
-                        raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item.get("name"), region_name))
+            if '|{}|'.format(item.get("name")) in regions_requiring:
+                raise ValidationError("Item %s is required by region %s, but the item is not marked as progression." % (item.get("name"), regions_requiring['|{}|'.format(item.get("name"))]))
 
     @staticmethod
     def _checkLocationRequiresForItemValueWithRegex(values_requested: dict[str, int], requires) -> dict[str, int]:
@@ -337,7 +354,7 @@ class DataValidation():
                 continue
 
             for connecting_region in region["connects_to"]:
-                region_exists = len([name for name in DataValidation.region_table if name == connecting_region]) > 0
+                region_exists = connecting_region in DataValidation.region_table
 
                 if not region_exists:
                     raise ValidationError("Region %s connects to a region %s, which is misspelled or does not exist." % (region_name, connecting_region))
@@ -412,12 +429,12 @@ class DataValidation():
 
             if "items" in starting_block:
                 for item_name in starting_block["items"]:
-                    if not item_name in [item.get("name") for item in DataValidation.item_table]:
+                    if not item_name in DataValidation.item_names:
                         raise ValidationError("Item %s is set as a starting item, but is misspelled or is not defined." % (item_name))
 
             if "item_categories" in starting_block:
                 for category_name in starting_block["item_categories"]:
-                    if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                    if category_name not in DataValidation.item_categories:
                         raise ValidationError("Item category %s is set as a starting item category, but is misspelled or is not defined on any items." % (category_name))
 
     @staticmethod
@@ -461,7 +478,7 @@ class DataValidation():
                 continue
 
             for item_name in place_item:
-                if not item_name in [item.get("name") for item in DataValidation.item_table]:
+                if not item_name in DataValidation.item_names:
                     raise ValidationError("Item %s is placed (using place_item) on a location, but is misspelled or is not defined." % (item_name))
 
     @staticmethod
@@ -475,7 +492,7 @@ class DataValidation():
                 continue
 
             for category_name in place_item_category:
-                if len([item for item in DataValidation.item_table if "category" in item and category_name in item["category"]]) == 0:
+                if category_name not in DataValidation.item_categories:
                     raise ValidationError("Item category %s is placed (using place_item_category) on a location, but is misspelled or is not defined." % (category_name))
 
     @staticmethod
@@ -501,11 +518,10 @@ class DataValidation():
             return
 
         nonstarting_regions = [region for region in DataValidation.region_table if not DataValidation.region_table[region].get("starting")]
+        connected_regions = {connecting_region for region in DataValidation.region_table.values() for connecting_region in region.get("connects_to") or []}
 
         for nonstarter in nonstarting_regions:
-            regions_that_connect_to = [region for region in DataValidation.region_table if "connects_to" in DataValidation.region_table[region] and nonstarter in DataValidation.region_table[region]["connects_to"]]
-
-            if len(regions_that_connect_to) == 0:
+            if nonstarter not in connected_regions:
                 raise ValidationError("The region '%s' is set as a non-starting region, but has no regions that connect to it. It will be inaccessible." % nonstarter)
 
 
@@ -522,9 +538,22 @@ def runPreFillDataValidation(world: World, multiworld: MultiWorld):
         raise Exception(f"\n\n{heading} \n\n{newline.join([' - ' + str(validation_error) for validation_error in validation_errors])}\n\n")
 
 # Called during stage_assert_generate
-def runGenerationDataValidation(cls) -> None:
+def runGenerationDataValidation(cls, force: bool = False) -> None:
+    """Run every generation check on the data, unless they already passed for the same data and code\n
+    The data files and every python file of the apworld are hashed, so any change to them runs the checks again\n
+    Setting the MANUAL_FORCE_DATA_VALIDATION environment variable, or force, always runs them"""
+    from .Helpers import get_package_hash, load_data_cache, save_data_cache
+
+    validation_hash = get_package_hash()
+    if not force and not os.environ.get("MANUAL_FORCE_DATA_VALIDATION") and load_data_cache("validation", validation_hash):
+        return
+
     validation_errors: list[ValidationError] = []
 
+    # the category index is built with the item lookups, after the tables above were seeded
+    DataValidation.item_category_to_item_names = cls.item_category_to_item_names
+    DataValidation.buildLookups()
+
     try: DataValidation.checkForMissingItemNames()
     except ValidationError as e: validation_errors.append(e)
 
@@ -592,3 +621,5 @@ def runGenerationDataValidation(cls) -> None:
         heading = f"ValidationError(s) in {cls.game}:";
 
         raise Exception("\n\n%s \n\n%s\n\n" % (heading, "\n".join([' - ' + str(validation_error) for validation_error in validation_errors])))
+
+    save_data_cache("validation", validation_hash, True)
@@ -1,5 +1,5 @@
 from BaseClasses import Item
-from .Data import item_table
+from .Data import item_table, event_table
 from .Game import filler_item_name, starting_index, game_name
 
 
@@ -63,6 +63,25 @@ for item in item_table:
 item_id_to_name[None] = "__Victory__"
 item_name_to_id = {name: id for id, name in item_id_to_name.items()}
 
+# every item category to the names of the items and events in it, used by the |@Category| requires
+category_item_names: dict[str, dict[str, None]] = {}
+for item in item_table + event_table:
+    categories = item.get("category", [])
+    if isinstance(categories, str):
+        categories = [categories]
+
+    for c in categories:
+        # a dict keeps the first position of each name without duplicates
+        category_item_names.setdefault(c, {})[item["name"]] = None
+
+item_category_to_item_names: dict[str, tuple[str, ...]] = {c: tuple(names) for c, names in category_item_names.items()}
+
+# same without the events, for what can be placed in or started from the item pool
+item_category_to_real_item_names: dict[str, set[str]] = {}
+for item in item_name_to_item.values():
+    for c in item.get("category", []):
+        item_category_to_real_item_names.setdefault(c, set()).add(item["name"])
+
 
 ######################
 # Item classes
@@ -1,6 +1,7 @@
 from BaseClasses import Location
 from .Data import location_table, event_table
 from .Game import starting_index, game_name
+from .Items import item_name_to_item, item_category_to_real_item_names
 from typing import Any
 
 
@@ -48,11 +49,13 @@ location_id_to_name: dict[int, str] = {}
 location_name_to_location: dict[str, dict[str, Any]] = {}
 location_name_groups: dict[str, list[str]] = {}
 event_name_to_event: dict[str, dict[str, Any]] = {}
+region_name_to_locations: dict[str, list[dict[str, Any]]] = {}
 
 for loc in location_table:
     loc_name = loc.get("name", f"Unnamed Location {loc['id']}")
     location_id_to_name[loc["id"]] = loc_name
     location_name_to_location[loc_name] = loc
+    region_name_to_locations.setdefault(loc["region"], []).append(loc)
 
     for c in loc.get("category", []):
         if c not in location_name_groups:
@@ -85,6 +88,28 @@ for key, event in enumerate(event_table):
         event_table[key]['region'] = "Manual"
     id += 1
 
+# the item names each location forbids or can be given by place_item(_category), resolved once here instead of for every player
+location_name_to_forbidden_item_names: dict[str, frozenset[str]] = {}
+location_name_to_eligible_item_names: dict[str, frozenset[str]] = {}
+for location_name, location in location_name_to_location.items():
+    forbidden_item_names = set()
+    if location.get("dont_place_item"):
+        forbidden_item_names.update(name for name in location["dont_place_item"] if name in item_name_to_item)
+
+    if location.get("dont_place_item_category"):
+        for c in location["dont_place_item_category"]:
+            forbidden_item_names.update(item_category_to_real_item_names.get(c, ()))
+
+    if forbidden_item_names:
+        location_name_to_forbidden_item_names[location_name] = frozenset(forbidden_item_names)
+
+    if "place_item" in location or "place_item_category" in location:
+        eligible_item_names = set(location.get("place_item") or [])
+        for c in location.get("place_item_category") or []:
+            eligible_item_names.update(item_category_to_real_item_names.get(c, ()))
+
+        location_name_to_eligible_item_names[location_name] = frozenset(eligible_item_names - forbidden_item_names)
+
 ######################
 # Location classes
 ######################
@@ -1,7 +1,7 @@
 from BaseClasses import Entrance, MultiWorld, Region, ItemClassification
 from .Helpers import is_category_enabled, is_location_enabled, is_event_enabled
 from .Data import region_table
-from .Locations import ManualLocation, location_name_to_location
+from .Locations import ManualLocation, location_name_to_location, region_name_to_locations
 from .Items import ManualItem
 from worlds.AutoWorld import World
 
@@ -33,11 +33,8 @@ def create_regions(world: World, multiworld: MultiWorld, player: int):
         if not exit_array:
             exit_array = None
 
-        locations = []
-        for location in world.location_table:
-            if "region" in location and location["region"] == region:
-                if is_location_enabled(multiworld, player, location):
-                    locations.append(location["name"])
+        locations = [location["name"] for location in region_name_to_locations.get(region, [])
+                     if is_location_enabled(multiworld, player, location)]
 
         new_region = create_region(world, multiworld, player, region, locations, exit_array)
         multiworld.regions += [new_region]
@@ -1,12 +1,16 @@
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from worlds.AutoWorld import World
-from ..Helpers import clamp, get_option_value
+from ..Helpers import clamp, get_option_value, option_only_requirement, cached_requirement, load_data_file
 from BaseClasses import MultiWorld, CollectionState
 
 import re
 
+if TYPE_CHECKING:
+    from ..Rules import RequireNode
+
 
 # Functions used to check the logic difficulty level.
+@option_only_requirement
 def easy_logic(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.logic_difficulty == 0:
         return True
@@ -14,6 +18,7 @@ def easy_logic(world: World, multiworld: MultiWorld, state: CollectionState, pla
         return False
 
 
+@option_only_requirement
 def normal_logic(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.logic_difficulty == 1:
         return True
@@ -21,6 +26,7 @@ def normal_logic(world: World, multiworld: MultiWorld, state: CollectionState, p
         return False
 
 
+@option_only_requirement
 def hard_logic(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.logic_difficulty == 2:
         return True
@@ -28,6 +34,7 @@ def hard_logic(world: World, multiworld: MultiWorld, state: CollectionState, pla
         return False
 
 
+@option_only_requirement
 def not_easy_logic(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.logic_difficulty > 0:
         return True
@@ -36,6 +43,7 @@ def not_easy_logic(world: World, multiworld: MultiWorld, state: CollectionState,
 
 
 # Functions used to check if the stage randomizer has been disabled.
+@option_only_requirement
 def vanilla_main_stages(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
         return True
@@ -43,6 +51,7 @@ def vanilla_main_stages(world: World, multiworld: MultiWorld, state: CollectionS
         return False
 
 
+@option_only_requirement
 def vanilla_ex_stages(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.stage_shuffle < 2:
         return True
@@ -54,6 +63,7 @@ def vanilla_ex_stages(world: World, multiworld: MultiWorld, state: CollectionSta
 # Archer, Beetle, Bomb, Fighter, Fire, Ice, Leaf, Spark, Stone, Whip, and Wing.
 #
 # If the Copy Ability Testing Room requires its vanilla conditions, this is used for that as well.
+@cached_requirement
 def can_fight_sectonia(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.queen_sectonia_boss_requirement == -1:
         return state.has("VS Masked Dedede", player)
@@ -61,871 +71,156 @@ def can_fight_sectonia(world: World, multiworld: MultiWorld, state: CollectionSt
         return state.has_group_unique("Bosses", player, world.options.queen_sectonia_boss_requirement.value)
 
 
+# Which items give access to each ability, depending on stage_shuffle, see data/ability_unlocks.json.
+# An entry without stage_shuffle applies to every other value of the option.
+ability_unlocks: dict[str, list[dict]] = load_data_file("ability_unlocks.json")
+
+
+def get_ability_rules(world: World) -> dict[str, "RequireNode"]:
+    """The compiled "can use" requires of every ability for the player's stage_shuffle, built once per player."""
+    ability_rules = getattr(world, "ability_rules", None)
+    if ability_rules is None:
+        ability_rules = {}
+        for ability, entries in ability_unlocks.items():
+            entry = next(entry for entry in entries
+                         if world.options.stage_shuffle.value in entry.get("stage_shuffle", [world.options.stage_shuffle.value]))
+            requires = f"|{ability}| AND ({entry['requires']})" if entry["requires"] else f"|{ability}|"
+            ability_rules[ability] = world.requires_compiler.compile_string(requires, {"name": f"can_use_{ability.lower()}"})
+        world.ability_rules = ability_rules
+    return ability_rules
+
+
+def can_use_ability(world: World, state: CollectionState, player: int, ability: str) -> bool:
+    """Can the player get and use the given copy ability? The result is cached per state."""
+    cache = world.requires_compiler.get_state_cache(state)
+    cache_key = ("can_use_ability", ability)
+    result = cache.get(cache_key)
+    if result is None:
+        result = cache[cache_key] = get_ability_rules(world)[ability](state)
+    return result
+
+
+@cached_requirement
 def can_use_archer(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Archer", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("VS Coily Rattler", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Archer", player)
-                and (state.has("Lollipop Land Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Old Odyssey Stage 1", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("Wild World Stage 1", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Royal Road Stage 5", player)
-                     or state.has("VS Masked Dedede", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Archer", player)
-                and (state.has("Lollipop Land Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Wild World Stage 1", player) or state.has("VS Coily Rattler", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Archer")
 
 
+@cached_requirement
 def can_use_beam(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Beam", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Beam", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player) or state.has("Lollipop Land Stage 1", player)
-                     or state.has("Lollipop Land Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 1) and state.has("Level 2 EX Stage Key", player))
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("VS Kracko", player)
-                     or state.has("Wild World Stage 1", player) or state.has("Wild World Stage 3", player)
-                     or state.has("Wild World Stage 5", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("VS Masked Dedede", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Beam", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Fine Fields Stage EX", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("Old Odyssey Stage 5", player)
-                     or state.has("VS Kracko", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 3", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("VS Masked Dedede", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Beam")
 
 
+@cached_requirement
 def can_use_beetle(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Beetle", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Beetle", player)
-                and (state.has("Fine Fields Stage 4", player) or state.has("VS Flowery Woods", player)
-                     or state.has("Progressive EX Stage Key", player, 1) or state.has("Level 1 EX Stage Key", player)
-                     or state.has("Wild World Stage 1", player) or state.has("Endless Explosions Stage 5", player)
-                     or (state.has("Grand Sun Stone", player, 4) and state.has("Level 5 EX Stage Key", player))
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage 5", player)
-                     or state.has("VS Masked Dedede", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Beetle", player)
-                and (state.has("Fine Fields Stage 4", player) or state.has("VS Flowery Woods", player)
-                     or state.has("Fine Fields Stage EX", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Beetle")
 
 
+@cached_requirement
 def can_use_bell(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Bell", player)
-    # We don't need a dedicated case for only main stages being shuffled because the relevant EX stages always
-    # become accessible only after the player is guaranteed to have encountered a Bell stage,
-    # so we can just check the full list of Bell stages.
-    else:
-        return (state.has("Bell", player)
-                and (state.has("Fine Fields Stage 2", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Paintra", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Wild World Stage 2", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Bell")
 
 
+@cached_requirement
 def can_use_bomb(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Bomb", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Old Odyssey Stage EX", player)
-                     or state.has("VS Pyribbit", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("VS Masked Dedede", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Bomb", player)
-                and (state.has("Lollipop Land Stage 3", player) or state.has("Lollipop Land Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 3", player)
-                     or state.has("Old Odyssey Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 2) and state.has("Level 3 EX Stage Key", player))
-                     or state.has("Wild World Stage 1", player) or state.has("Wild World Stage 2", player)
-                     or state.has("Wild World Stage 3", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Wild World Stage 5", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Royal Road Stage 5", player)
-                     or state.has("VS Masked Dedede", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Bomb", player)
-                and (state.has("Lollipop Land Stage 3", player) or state.has("Lollipop Land Stage 4", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage EX", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Wild World Stage 3", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Bomb")
 
 
+@cached_requirement
 def can_use_circus(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Circus", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Wild World Stage EX", player)
-                     or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Circus", player)
-                and (state.has("Lollipop Land Stage 4", player) or state.has("VS Paintra", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Wild World Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 3)
-                         and (state.has("Progressive EX Stage Key", player, 4)
-                              or state.has("Level 4 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Circus", player)
-                and (state.has("Lollipop Land Stage 4", player) or state.has("VS Paintra", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Wild World Stage EX", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("VS Masked Dedede", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Circus")
 
 
+@cached_requirement
 def can_use_crash(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Crash", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage EX", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Crash", player)
-                and (state.has("Lollipop Land Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 2)
-                         and (state.has("Progressive EX Stage Key", player, 3)
-                              or state.has("Level 3 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Wild World Stage 3", player) or state.has("Wild World Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player))
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Crash", player)
-                and (state.has("Lollipop Land Stage 3", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage 3", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Wild World Stage EX", player) or state.has("Royal Road Stage 5", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Crash")
 
 
+@cached_requirement
 def can_use_cutter(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Cutter", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Cutter", player)
-                and (state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player) or state.has("Lollipop Land Stage 1", player)
-                     or state.has("Lollipop Land Stage 2", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 3", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Cutter", player)
-                and (state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Fine Fields Stage EX", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 2", player)
-                     or state.has("Old Odyssey Stage 1", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage EX", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Cutter")
 
 
+@cached_requirement
 def can_use_fighter(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0:
-        return (state.has("Fighter", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("VS Pyribbit", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Fighter", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     and (state.has("Progressive EX Stage Key", player, 2)
-                          or state.has("Level 2 EX Stage Key", player)
-                          )
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 2:
-        return (state.has("Fighter", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Fighter", player)
-                and (state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Fighter")
 
 
+@cached_requirement
 def can_use_fire(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Fire", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Fire", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 2", player)
-                     or state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player) or state.has("Lollipop Land Stage 1", player)
-                     or state.has("Lollipop Land Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 1) and state.has("Level 2 EX Stage Key", player))
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Old Odyssey Stage 5", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage 5", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Fire", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 2", player)
-                     or state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("VS Flowery Woods", player) or state.has("Fine Fields Stage EX", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 3", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage 5", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Wild World Stage EX", player)
-                     or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Fire")
 
 
+@cached_requirement
 def can_use_hammer(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Hammer", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage EX", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Hammer", player)
-                and (state.has("Old Odyssey Stage 2", player)
-                     or (state.has("Grand Sun Stone", player, 2)
-                         and (state.has("Progressive EX Stage Key", player, 3)
-                              or state.has("Level 3 EX Stage Key", player)
-                              )
-                         )
-                     or (state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player))
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Royal Road Stage 5", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Hammer", player)
-                and (state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage EX", player) or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Hammer")
 
 
+@cached_requirement
 def can_use_ice(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Ice", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Ice", player)
-                and (state.has("Fine Fields Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage 5", player)
-                     or (state.has("Grand Sun Stone", player, 2)
-                         and (state.has("Progressive EX Stage Key", player, 3)
-                              or state.has("Level 3 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Wild World Stage 4", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Ice", player)
-                and (state.has("Fine Fields Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("VS Pyribbit", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Ice")
 
 
+@cached_requirement
 def can_use_leaf(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Leaf", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("VS Kracko", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Leaf", player)
-                and (state.has("Old Odyssey Stage 1", player) or state.has("VS Kracko", player)
-                     or state.has("Wild World Stage 1", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Wild World Stage 5", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Leaf")
 
 
+@cached_requirement
 def can_use_mike(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Mike", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Mike", player)
-                and (state.has("Old Odyssey Stage 2", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Mike")
 
 
+@cached_requirement
 def can_use_needle(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Needle", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Needle", player)
-                and (state.has("Fine Fields Stage 4", player) or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Wild World Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player))
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Needle", player)
-                and (state.has("Fine Fields Stage 4", player) or state.has("Fine Fields Stage EX", player)
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Wild World Stage 4", player)
-                     or state.has("Wild World Stage EX", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Needle")
 
 
+@cached_requirement
 def can_use_ninja(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Ninja", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("VS Kracko", player)
-                     or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Ninja", player)
-                and (state.has("Lollipop Land Stage 3", player) or state.has("Lollipop Land Stage 4", player)
-                     or state.has("VS Kracko", player)
-                     or (state.has("Grand Sun Stone", player, 2)
-                         and (state.has("Progressive EX Stage Key", player, 3)
-                              or state.has("Level 3 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Wild World Stage 2", player) or state.has("Wild World Stage 3", player)
-                     or state.has("Endless Explosions Stage 2", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Ninja", player)
-                and (state.has("Lollipop Land Stage 3", player) or state.has("Lollipop Land Stage 4", player)
-                     or state.has("VS Kracko", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Wild World Stage 3", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Ninja")
 
 
+@cached_requirement
 def can_use_parasol(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Parasol", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("VS Kracko", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Parasol", player)
-                and (state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Old Odyssey Stage 1", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("VS Kracko", player) or state.has("Wild World Stage 2", player)
-                     or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Parasol", player)
-                and (state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 4", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("VS Kracko", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Parasol")
 
 
+@cached_requirement
 def can_use_spark(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Spark", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Spark", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("Progressive EX Stage Key", player, 1) or state.has("Level 1 EX Stage Key", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Lollipop Land Stage 4", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 2) and state.has("Level 3 EX Stage Key", player))
-                     or state.has("Wild World Stage 5", player)
-                     or (state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player))
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Spark", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("Fine Fields Stage EX", player) or state.has("Lollipop Land Stage 1", player)
-                     or state.has("Lollipop Land Stage 3", player) or state.has("Lollipop Land Stage 4", player)
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 3", player)
-                     or state.has("Old Odyssey Stage EX", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Wild World Stage EX", player) or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Royal Road Stage 1", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Spark")
 
 
+@cached_requirement
 def can_use_spear(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Spear", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("VS Paintra", player)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("VS Coily Rattler", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Spear", player)
-                and (state.has("Lollipop Land Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("VS Paintra", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Wild World Stage 5", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Spear", player)
-                and (state.has("Lollipop Land Stage 2", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("VS Paintra", player) or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Old Odyssey Stage 5", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Wild World Stage 5", player)
-                     or state.has("VS Coily Rattler", player) or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 4", player)
-                     or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Royal Road Stage 4", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Spear")
 
 
+@cached_requirement
 def can_use_stone(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0:
-        return (state.has("Stone", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and state.has("Level 2 EX Stage Key", player)
-                         )
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Stone", player)
-                and (state.has("Progressive EX Stage Key", player, 1) or state.has("Level 1 EX Stage Key", player)
-                     or (state.has("Grand Sun Stone", player, 1) and state.has("Level 2 EX Stage Key", player))
-                     or state.has("Old Odyssey Stage 1", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 4", player)
-                     or state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 2:
-        return (state.has("Stone", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Fine Fields Stage EX", player)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Wild World Stage EX", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Stone", player)
-                and (state.has("Fine Fields Stage EX", player) or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Old Odyssey Stage 1", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Wild World Stage 1", player)
-                     or state.has("Wild World Stage 4", player) or state.has("Wild World Stage EX", player)
-                     or state.has("Endless Explosions Stage 2", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Stone")
 
 
+@cached_requirement
 def can_use_sword(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Sword", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Sword", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 2", player)
-                     or state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("Lollipop Land Stage 3", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 4", player)
-                     or (state.has("Grand Sun Stone", player, 2)
-                         and (state.has("Progressive EX Stage Key", player, 3)
-                              or state.has("Level 3 EX Stage Key", player))
-                         )
-                     or state.has("Wild World Stage 2", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Sword", player)
-                and (state.has("Fine Fields Stage 1", player) or state.has("Fine Fields Stage 2", player)
-                     or state.has("Fine Fields Stage 3", player) or state.has("Fine Fields Stage 4", player)
-                     or state.has("Lollipop Land Stage 3", player) or state.has("Old Odyssey Stage 1", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("Old Odyssey Stage EX", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 5", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Sword")
 
 
+@cached_requirement
 def can_use_wheel(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return (state.has("Wheel", player)
-                and (state.has("Grand Sun Stone", player, 1)
-                     or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Endless Explosions Stage EX", player)
-                     or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Wheel", player)
-                and (state.has("Lollipop Land Stage 1", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Wild World Stage 2", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Copy Ability Testing Room", player)
-                     )
-                )
-    else:
-        return (state.has("Wheel", player)
-                and (state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage EX", player)
-                     or state.has("Wild World Stage 2", player) or state.has("Endless Explosions Stage 1", player)
-                     or state.has("Endless Explosions Stage 5", player)
-                     or state.has("Endless Explosions Stage EX", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 4", player) or state.has("Royal Road Stage EX 1", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Wheel")
 
 
+@cached_requirement
 def can_use_whip(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
-        return state.has("Whip", player)
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Whip", player)
-                and (state.has("Fine Fields Stage 2", player) or state.has("Fine Fields Stage 3", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 3", player)
-                     or (state.has("Grand Sun Stone", player, 1)
-                         and (state.has("Progressive EX Stage Key", player, 2)
-                              or state.has("Level 2 EX Stage Key", player)
-                              )
-                         )
-                     or state.has("Old Odyssey Stage 2", player) or state.has("Old Odyssey Stage 3", player)
-                     or state.has("Wild World Stage 5", player) or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Whip", player)
-                and (state.has("Fine Fields Stage 2", player) or state.has("Fine Fields Stage 3", player)
-                     or state.has("Lollipop Land Stage 1", player) or state.has("Lollipop Land Stage 3", player)
-                     or state.has("Lollipop Land Stage EX", player) or state.has("Old Odyssey Stage 2", player)
-                     or state.has("Old Odyssey Stage 3", player) or state.has("Wild World Stage 5", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 2", player)
-                     or state.has("Royal Road Stage EX 1", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Whip")
 
 
+@cached_requirement
 def can_use_wing(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
-    if world.options.stage_shuffle == 0:
-        return (state.has("Wing", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Progressive EX Stage Key", player, 1)
-                     or state.has("Level 1 EX Stage Key", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 1:
-        return (state.has("Wing", player)
-                and (state.has("Progressive EX Stage Key", player, 1) or state.has("Level 1 EX Stage Key", player)
-                     or state.has("Old Odyssey Stage 4", player) or state.has("Wild World Stage 1", player)
-                     or (state.has("Grand Sun Stone", player, 3) and state.has("Level 4 EX Stage Key", player))
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    elif world.options.stage_shuffle == 2:
-        return (state.has("Wing", player)
-                and (state.has("Grand Sun Stone", player, 2)
-                     or state.has("Fine Fields Stage EX", player)
-                     or state.has("Wild World Stage EX", player)
-                     or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
-    else:
-        return (state.has("Wing", player)
-                and (state.has("Fine Fields Stage EX", player) or state.has("Old Odyssey Stage 4", player)
-                     or state.has("Wild World Stage 1", player) or state.has("Wild World Stage EX", player)
-                     or state.has("Endless Explosions Stage 3", player)
-                     or state.has("Endless Explosions Stage 5", player) or state.has("Royal Road Stage 1", player)
-                     or state.has("Royal Road Stage 2", player) or state.has("Copy Ability Testing Room", player)
-                     or can_fight_sectonia(world, multiworld, state, player)
-                     )
-                )
+    return can_use_ability(world, state, player, "Wing")
 
 
+@cached_requirement
 def fine_fields_hal_room(world: World, multiworld: MultiWorld, state: CollectionState, player: int) -> bool:
     if world.options.stage_shuffle == 0 or world.options.stage_shuffle == 2:
         # Hammer is never logically relevant for abilities without stage rando, but this function is used elsewhere too.
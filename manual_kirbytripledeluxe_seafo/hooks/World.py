@@ -533,6 +533,12 @@ def after_create_item(item: ManualItem, world: World, multiworld: MultiWorld, pl
     return item
 
 
+# create_items makes all the copies of an item name (and classification override) at once, the full list of copies is provided here.
+# While before_create_item and after_create_item are left as they are, they only run on the first copy, which is then copied
+def after_create_item_copies(items: list[ManualItem], world: World, multiworld: MultiWorld, player: int) -> list[ManualItem]:
+    return items
+
+
 # This method is run towards the end of pre-generation, before the place_item options have been handled and before AP generation occurs
 def before_generate_basic(world: World, multiworld: MultiWorld, player: int) -> list:
     pass
@@ -1,13 +1,21 @@
 import ast
 import csv
+import hashlib
+import importlib.resources
+import logging
+import marshal
 import os
 import pkgutil
 import json
+import sys
+
+import Utils
 
 from BaseClasses import MultiWorld, Item
 from enum import IntEnum
-from typing import Optional, List, TYPE_CHECKING, Union, get_args, get_origin, Any
-from types import GenericAlias
+from functools import lru_cache
+from typing import Optional, List, Iterable, TYPE_CHECKING, Union, get_args, get_origin, Any
+from types import GenericAlias, MappingProxyType
 from worlds.AutoWorld import World
 from .hooks.Helpers import before_is_category_enabled, before_is_item_enabled, before_is_location_enabled
 
@@ -26,6 +34,65 @@ def load_data_file(*args) -> dict:
 
     return filedata
 
+def hash_data_files(*paths: str) -> str:
+    """Return a hash of the content of the given files of this apworld, paths are relative to the apworld's root"""
+    digest = hashlib.sha256(f"{sys.version_info[:2]}:{marshal.version}".encode())
+    for path in paths:
+        try:
+            contents = pkgutil.get_data(__name__, path)
+        except OSError:
+            contents = None
+        digest.update(f"{path}:{-1 if contents is None else len(contents)}:".encode())
+        digest.update(contents or b"")
+    return digest.hexdigest()
+
+def get_package_files(folder: str = "", suffix: str = "") -> list[str]:
+    """Return the path of every file ending with suffix in a folder of this apworld and its subfolders, relative to the apworld's root\n
+    Works the same whether the apworld is a folder or a zip"""
+    paths = []
+    folders = [(importlib.resources.files(__package__).joinpath(folder) if folder else importlib.resources.files(__package__), folder)]
+    while folders:
+        traversable, path = folders.pop()
+        if not traversable.is_dir():
+            continue
+        for child in traversable.iterdir():
+            child_path = f"{path}/{child.name}" if path else child.name
+            if child.is_dir():
+                if child.name != "__pycache__":
+                    folders.append((child, child_path))
+            elif child.name.endswith(suffix):
+                paths.append(child_path)
+    return sorted(paths)
+
+@lru_cache(maxsize=None)
+def get_package_hash() -> str:
+    """Return a hash of every data and python file of this apworld, it's only computed once"""
+    return hash_data_files(*get_package_files("data"), *get_package_files(suffix=".py"))
+
+def get_data_cache_path(name: str) -> str:
+    return Utils.cache_path("manual", f"{__package__}.{name}.marshal")
+
+def load_data_cache(name: str, key: str) -> Optional[Any]:
+    """Return what was saved with save_data_cache under this name if it was saved with the same key, None otherwise"""
+    try:
+        with open(get_data_cache_path(name), "rb") as cache_file:
+            cached_key, data = marshal.load(cache_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return data if cached_key == key else None
+
+def save_data_cache(name: str, key: str, data: Any):
+    """Save data for a later load_data_cache, it can only contain builtin types like the ones found in json files"""
+    path = get_data_cache_path(name)
+    try:
+        contents = marshal.dumps((key, data))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "wb") as cache_file:
+            cache_file.write(contents)
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+    except (OSError, ValueError) as e:
+        logging.debug(f"Could not save the {name} cache of {__package__}: {e}")
+
 def load_data_csv(*args) -> list[dict]:
     fname = "/".join(["data", *args])
 
@@ -59,6 +126,10 @@ def clamp(value, min, max):
 def is_category_enabled(multiworld: MultiWorld, player: int, category_name: str) -> bool:
     from .Data import category_table
     """Check if a category has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None and category_name in table.categories:
+        return table.categories[category_name]
+
     hook_result = before_is_category_enabled(multiworld, player, category_name)
     if hook_result is not None:
         return hook_result
@@ -89,6 +160,12 @@ def is_item_name_enabled(multiworld: MultiWorld, player: int, item_name: str) ->
 
 def is_item_enabled(multiworld: MultiWorld, player: int, item: "ManualItem") -> bool:
     """Check if an item has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None:
+        enabled = _lookup_enabled(table.items, item.get("name"), item)
+        if enabled is not None:
+            return enabled
+
     hook_result = before_is_item_enabled(multiworld, player, item)
     if hook_result is not None:
         return hook_result
@@ -105,6 +182,12 @@ def is_location_name_enabled(multiworld: MultiWorld, player: int, location_name:
 
 def is_location_enabled(multiworld: MultiWorld, player: int, location: "ManualLocation") -> bool:
     """Check if a location has been disabled by a yaml option."""
+    table = get_enablement_table(multiworld, player)
+    if table is not None:
+        enabled = _lookup_enabled(table.locations, location.get("name"), location)
+        if enabled is not None:
+            return enabled
+
     hook_result = before_is_location_enabled(multiworld, player, location)
     if hook_result is not None:
         return hook_result
@@ -123,9 +206,76 @@ def _is_manualobject_enabled(multiworld: MultiWorld, player: int, object: Any) -
 
     return enabled
 
+class EnablementTable:
+    """Whether each of the categories, items and locations of a player is enabled, computed once in generate_early.\n
+    The items/locations are stored by name along with their data, so a different object with the same name still gets checked normally."""
+    __slots__ = ("categories", "items", "locations")
+
+    def __init__(self, categories: dict[str, bool], items: dict[str, tuple[dict[str, Any], bool]], locations: dict[str, tuple[dict[str, Any], bool]]):
+        self.categories = MappingProxyType(categories)
+        self.items = MappingProxyType(items)
+        self.locations = MappingProxyType(locations)
+
+def _lookup_enabled(entries: MappingProxyType, name: Optional[str], object: Any) -> Optional[bool]:
+    entry = entries.get(name)
+    if entry is None or entry[0] is not object:
+        return None
+    return entry[1]
+
+def get_enablement_table(multiworld: MultiWorld, player: int) -> Optional[EnablementTable]:
+    """Return the enablement table of a player, or None if it wasn't built (yet)."""
+    return getattr(multiworld.worlds[player], "enablement_table", None)
+
+def build_enablement_table(world: World) -> EnablementTable:
+    """Check once if each of the categories, items and locations is enabled for the world's player.\n
+    The is_*_enabled helpers then answer from this table instead of calling the hooks and checking the options again."""
+    multiworld = world.multiworld
+    player = world.player
+    world.enablement_table = None
+
+    # gather every category an object could check, even the ones missing from categories.json
+    category_names = set(world.category_table)
+    for object in [*world.item_name_to_item.values(), *world.location_name_to_location.values()]:
+        category_names.update(object.get("category", []))
+    categories = {name: is_category_enabled(multiworld, player, name) for name in category_names}
+
+    # the objects below reuse the category results through this partial table
+    world.enablement_table = EnablementTable(categories, {}, {})
+    items = {name: (item, is_item_enabled(multiworld, player, item)) for name, item in world.item_name_to_item.items()}
+    locations = {name: (location, is_location_enabled(multiworld, player, location)) for name, location in world.location_name_to_location.items()}
+
+    world.enablement_table = EnablementTable(categories, items, locations)
+    return world.enablement_table
+
+def invalidate_enablement_table(world: World, rebuild: bool = True):
+    """Drop the enablement table of the world's player, to use when a hook changes the options after generate_early.\n
+    By default the table is rebuilt right away from the current options. With rebuild=False, every is_*_enabled call computes its answer again."""
+    had_table = getattr(world, "enablement_table", None) is not None
+    world.enablement_table = None
+    if rebuild and had_table:
+        build_enablement_table(world)
+
+def get_items_by_player(multiworld: MultiWorld) -> dict[int, list[Item]]:
+    """Return every item of the multiworld, including placed items, grouped by player\n
+    The grouping is done in one pass over the items and shared by all the players until the item pool changes size or reset_items_by_player_cache is called.\n
+    The world resets it at the start of each of its steps, since other worlds can change the items in between, and after its own changes to the items.
+    A hook changing the items in the middle of a step should reset it too
+    """
+    cache = getattr(multiworld, "manual_items_by_player", None)
+    if cache is None or cache[0] != len(multiworld.itempool):
+        items_by_player: dict[int, list[Item]] = {}
+        for item in multiworld.get_items():
+            items_by_player.setdefault(item.player, []).append(item)
+        cache = (len(multiworld.itempool), items_by_player)
+        multiworld.manual_items_by_player = cache
+    return cache[1]
+
+def reset_items_by_player_cache(multiworld: MultiWorld):
+    multiworld.manual_items_by_player = None
+
 def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollected: bool = False) -> List[Item]:
     """Return list of items of a player including placed items"""
-    items = [i for i in multiworld.get_items() if i.player == player]
+    items = list(get_items_by_player(multiworld).get(player, []))
     if includePrecollected:
         items.extend(multiworld.precollected_items.get(player, []))
     return items
@@ -133,13 +283,44 @@ def get_items_for_player(multiworld: MultiWorld, player: int, includePrecollecte
 def reset_specific_item_value_cache_for_player(world: World, value: str, player: Optional[int] = None) -> dict[str, int]:
     if player is None:
         player = world.player
-    return world.item_values[player].pop(value, {})
+    # the value index is rebuilt as a whole on the next lookup
+    world.item_values_source.pop(player, None)
+    return world.item_values.get(player, {}).pop(value.lower().strip(), {})
 
 def reset_item_value_cache_for_player(world: World, player: Optional[int] = None):
     if player is None:
         player = world.player
+    world.item_values_source.pop(player, None)
     world.item_values[player] = {}
 
+def build_item_value_index(world: World, items: Iterable[Item]) -> dict[str, dict[str, int]]:
+    """Return how much of each value the given items are worth, in the format {'value name': {'Item Name': value count}}"""
+    index: dict[str, dict[str, int]] = {}
+    for item_name in {i.name for i in items if i.code is not None}:
+        for value, count in world.item_name_to_item.get(item_name, {}).get("value", {}).items():
+            index.setdefault(value, {})[item_name] = count
+
+    return index
+
+def get_item_value_index(world: World, player: Optional[int] = None) -> Optional[dict[str, dict[str, int]]]:
+    """Return the value index of a player's items and precollected items, or None while the player has none.\n
+    It's built on first use from the items grouped by get_items_by_player,
+    and built again once that grouping is reset or the player gets more precollected items."""
+    if player is None:
+        player = world.player
+
+    items = get_items_by_player(world.multiworld).get(player)
+    precollected_items = world.multiworld.precollected_items.get(player, [])
+    if not items and not precollected_items:
+        return None
+
+    source = world.item_values_source.get(player)
+    if source is None or source[0] is not items or source[1] != len(precollected_items):
+        world.item_values[player] = build_item_value_index(world, (items or []) + precollected_items)
+        world.item_values_source[player] = (items, len(precollected_items))
+
+    return world.item_values[player]
+
 def get_items_with_value(world: World, multiworld: MultiWorld, value: str, player: Optional[int] = None, skipCache: bool = False) -> dict[str, int]:
     """Return a dict of every items with a specific value type present in their respective 'value' dict\n
     Output in the format 'Item Name': 'value count'\n
@@ -149,28 +330,19 @@ def get_items_with_value(world: World, multiworld: MultiWorld, value: str, playe
     if player is None:
         player = world.player
 
+    if not skipCache:
+        index = get_item_value_index(world, player)
+        if index is not None:
+            return index.get(value.lower().strip(), {})
+
+    # Before create_items there's no index yet, and skipCache asks to look at the player's items directly
     player_items = get_items_for_player(multiworld, player, True)
     # Just a small check to prevent caching {} if items don't exist yet
     if not player_items:
         return {value: -1}
 
     value = value.lower().strip()
-
-    if not skipCache:
-        if not hasattr(world, 'item_values'): #Cache of just the item values
-            world.item_values = {}
-
-        if not world.item_values.get(player):
-            world.item_values[player] = {}
-
-    if value not in world.item_values.get(player, {}).keys() or skipCache:
-        item_with_values = {i.name: world.item_name_to_item[i.name]['value'].get(value, 0)
-                            for i in player_items if i.code is not None
-                            and i.name in world.item_name_groups.get(f'has_{value}_value', [])}
-        if skipCache:
-            return item_with_values
-        world.item_values[player][value] = item_with_values
-    return world.item_values[player].get(value)
+    return build_item_value_index(world, player_items).get(value, {})
 
 
 def filter_used_regions(player_regions: dict|list) -> set:
@@ -215,6 +387,34 @@ def format_to_valid_identifier(input: str) -> str:
         input = "_" + input
     return input.replace(" ", "_")
 
+def remove_specific_items(source: list[Item], items: Iterable[Item]) -> list[Item]:
+    """Remove and return several items from a list in a single pass, checking that each item IS the exact same as in the list.
+    \nThe list is modified in place and keeps its order, use this over one remove per item when removing many items from a big list.
+    \nRaise ValueError if any of the items is not in the list, in which case the list is left untouched."""
+    pending: dict[int, list] = {}
+    for item in items:
+        pending.setdefault(id(item), [item, 0])[1] += 1
+
+    if not pending:
+        return []
+
+    removed = []
+    kept = []
+    for item in source:
+        entry = pending.get(id(item))
+        if entry is not None and entry[1] > 0:
+            entry[1] -= 1
+            removed.append(item)
+        else:
+            kept.append(item)
+
+    for item, count in pending.values():
+        if count > 0:
+            raise ValueError(f"Item '{item.name}' could not be found in source list")
+
+    source[:] = kept
+    return removed
+
 class ProgItemsCat(IntEnum):
     VALUE = 1
     CATEGORY = 2
@@ -316,3 +516,16 @@ def convert_string_to_type(input: str, target_type: type) -> Any:
 
     newline = "\n"
     raise Exception(f"'{value}' could not be converted to {target_type}, here's the conversion failure message(s):\n\n{newline.join([' - ' + str(validation_error) for validation_error in errors])}\n\n")
+
+def option_only_requirement(func):
+    """Decorator for requirement functions whose result only depends on the player's options.\n
+    Their result is then computed once per player when the rules are compiled, instead of on every access check."""
+    func.option_only_requirement = True
+    return func
+
+def cached_requirement(func):
+    """Decorator for requirement functions whose result only depends on the items the player has.\n
+    Their result is then cached per state until an item of the player is collected or removed.
+    Any other function is called on every access check, as it could depend on anything, like what the state can reach."""
+    func.cached_requirement = True
+    return func